@@ -1,7 +1,13 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
-from domino.data_sources import DataSourceClient
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from data.data_source import get_data_source
+from data import mirror
 
 st.markdown(
     """
@@ -13,16 +19,10 @@ st.markdown(
 
 @st.cache_data(ttl=120)
 def load_reference_rates():
-    ds = DataSourceClient().get_datasource("market_data")
-    sql = """
-        SELECT rate_type,
-               rate_date,
-               rate,
-               volume_in_billions
-          FROM reference_rates
-         ORDER BY rate_date;
-    """
-    df = ds.query(sql).to_pandas()
+    ds = get_data_source("market_data")
+    # whole history from the local Parquet mirror (only rows newer than its watermark are fetched)
+    df = mirror.load(ds, "reference_rates",
+                     columns=["rate_type", "rate_date", "rate", "volume_in_billions"], max_age=120).to_pandas()
     df["rate_date"] = pd.to_datetime(df["rate_date"])
     return df
 
@@ -6,8 +6,13 @@ from datetime import datetime
 from pathlib import Path
 import sys
 
-from domino.data_sources import DataSourceClient  
-ds = DataSourceClient().get_datasource("market_data")
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from data.data_source import get_data_source
+from data.query import run_query
+from data.columnar import pivot_matrix, ffill
+from data import mirror
+ds = get_data_source("market_data")   # pooled, shared across sessions
 
 @st.cache_data
 def fetch_curve_types():
@@ -24,13 +29,13 @@ selected_curve = st.sidebar.selectbox("Curve Type", curve_types)
 
 @st.cache_data
 def fetch_dates(curve_type):
-    sql = f"""
+    sql = """
     SELECT DISTINCT curve_date
     FROM rate_curves
-    WHERE curve_type = '{curve_type}'
+    WHERE curve_type = :curve_type
     ORDER BY curve_date;
     """
-    df = ds.query(sql).to_pandas()
+    df = run_query(ds, sql, {"curve_type": curve_type}).to_pandas()
     df["curve_date"] = pd.to_datetime(df["curve_date"])
     return df["curve_date"].dt.date.tolist()
 
@@ -44,48 +49,36 @@ if start_date > end_date:
 
 @st.cache_data
 def fetch_tenors(curve_type):
-    sql = f"""
+    sql = """
     SELECT DISTINCT tenor_num
     FROM rate_curves
-    WHERE curve_type = '{curve_type}'
+    WHERE curve_type = :curve_type
     ORDER BY tenor_num;
     """
-    df = ds.query(sql).to_pandas()
+    df = run_query(ds, sql, {"curve_type": curve_type}).to_pandas()
     return sorted(df["tenor_num"].tolist())
 
 tenors = fetch_tenors(selected_curve)
 
 @st.cache_data
 def fetch_rate_curves(curve_type, start_date, end_date):
-    sql = f"""
-    SELECT curve_date, tenor_num, rate
-    FROM rate_curves
-    WHERE curve_type = '{curve_type}'
-      AND curve_date BETWEEN '{start_date}' AND '{end_date}'
-      AND tenor_num IN ({','.join(str(t) for t in tenors)})
-    ORDER BY curve_date, tenor_num;
-    """
-    return ds.query(sql).to_pandas()
+    # typed columns (curve_date → datetime64[D], tenor_num / rate → float64) from the local mirror
+    return mirror.load_columns(ds, "rate_curves", start_date, end_date,
+                               columns=["curve_date", "tenor_num", "rate"],
+                               where={"curve_type": curve_type, "tenor_num": tenors})
 
-rates_df = fetch_rate_curves(selected_curve, start_date, end_date)
-rates_df["curve_date"] = pd.to_datetime(rates_df["curve_date"])
+rate_cols = fetch_rate_curves(selected_curve, start_date, end_date)
 
-if rates_df.empty:
+if not len(rate_cols["rate"]):
     st.warning("No data available for the selected range and curve type.")
     st.stop()
 
-# Pivot & forward‐fill missing tenor values
-pivot = (
-    rates_df
-    .pivot(index="curve_date", columns="tenor_num", values="rate")
-    .sort_index()
-)
-pivot = pivot.ffill(axis=0)
+# Pivot straight to the (dates × tenors) matrix & forward‐fill missing tenor values
+date_index, tenor_index, z_values = pivot_matrix(rate_cols["curve_date"], rate_cols["tenor_num"], rate_cols["rate"])
+z_values = ffill(z_values)  # shape = (n_dates, n_tenors)
 
-date_index = pivot.index
-tenor_index = pivot.columns.tolist()
-date_strs = [d.strftime("%Y-%m-%d") for d in date_index]
-z_values = pivot.values  # shape = (n_dates, n_tenors)
+tenor_index = tenor_index.tolist()
+date_strs = np.datetime_as_string(date_index, unit="D").tolist()
 
 # ─────────────────────────────────────────────────────────────
 # Reverse the date axis so it isn’t “upside‐down”
@@ -1,12 +1,18 @@
+import sys
+from pathlib import Path
 import streamlit as st
 import pandas as pd
 import altair as alt
 import calendar
-from domino.data_sources import DataSourceClient
 from datetime import date, datetime
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from data.curve_store import CurveStore
+from data.data_source import get_data_source
+
 # ─── Data access ────────────────────────────────────────────────────────────
-ds = DataSourceClient().get_datasource("market_data")
+ds = get_data_source("market_data")   # pooled, shared across sessions
 
 @st.cache_data(ttl=120)
 def get_available_dates() -> list[date]:
@@ -18,15 +24,21 @@ def get_available_dates() -> list[date]:
     df["curve_date"] = pd.to_datetime(df["curve_date"])
     return df["curve_date"].dt.date.tolist()
 
-@st.cache_data
+@st.cache_resource
+def get_curve_store() -> CurveStore:
+    # whole history in one read; later dates are appended incrementally
+    return CurveStore.load(ds, date(2010, 1, 1), date.today())
+
 def load_curve_for_date(selected_date: date) -> pd.DataFrame:
-    sql = f"""
-    SELECT tenor_num, rate
-      FROM rate_curves
-     WHERE curve_date = '{selected_date}'
-     ORDER BY tenor_num;
-    """
-    return ds.query(sql).to_pandas()
+    store = get_curve_store()
+    # fetch newer curves only when rate_curves has the date (the list is cached for 120s), so
+    # dates without a curve don't hit the database on every rerun
+    if len(store) and selected_date not in store and selected_date in get_available_dates():
+        store.refresh(selected_date)
+    if selected_date not in store:
+        return pd.DataFrame(columns=["tenor_num", "rate"])
+    tenors, rates = store.quoted(selected_date)
+    return pd.DataFrame({"tenor_num": tenors, "rate": rates})
 
 # ─── Callbacks to modify session_state ────────────────────────────────────────
 def on_date_change():
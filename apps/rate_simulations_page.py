@@ -3,14 +3,21 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
-from domino.data_sources import DataSourceClient
+import sys
+from pathlib import Path
 from datetime import date
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from data.data_source import get_data_source
+from data.query import run_query
+from data import mirror
+
 BASE_COLOR   = "crimson"
 MODEL_COLORS = ["#1f77b4", "#ff7f0e"]  # first model → blue, second → orange
 
 # ─── Data access ────────────────────────────────────────────────────────────
-ds = DataSourceClient().get_datasource("market_data")
+ds = get_data_source("market_data")   # pooled, shared across sessions
 
 @st.cache_data(ttl=120)
 def get_available_dates() -> list[date]:
@@ -24,49 +31,41 @@ def get_available_dates() -> list[date]:
 
 @st.cache_data(ttl=120)
 def get_available_days(as_of_date: date) -> list[int]:
-    df = ds.query(f"""
+    df = run_query(ds, """
         SELECT DISTINCT days_forward
           FROM rate_cones
-         WHERE curve_date = '{as_of_date}'
+         WHERE curve_date = :as_of_date
          ORDER BY days_forward
-    """).to_pandas()
+    """, {"as_of_date": as_of_date}).to_pandas()
     return df["days_forward"].astype(int).tolist()
 
 @st.cache_data(ttl=120)
 def get_available_models(as_of_date: date, days_forward: int) -> list[str]:
-    df = ds.query(f"""
+    df = run_query(ds, """
         SELECT DISTINCT model_type
           FROM rate_cones
-         WHERE curve_date    = '{as_of_date}'
-           AND days_forward = {days_forward}
+         WHERE curve_date    = :as_of_date
+           AND days_forward = :days_forward
          ORDER BY model_type
-    """).to_pandas()
+    """, {"as_of_date": as_of_date, "days_forward": days_forward}).to_pandas()
     return df["model_type"].tolist()
 
 @st.cache_data
 def load_base_curve(as_of_date: date) -> pd.DataFrame:
-    sql = f"""
+    sql = """
     SELECT tenor_num, rate
       FROM rate_curves
-     WHERE curve_date = '{as_of_date}'
+     WHERE curve_date = :as_of_date
      ORDER BY tenor_num;
     """
-    return ds.query(sql).to_pandas()
+    return run_query(ds, sql, {"as_of_date": as_of_date}).to_pandas()
 
 @st.cache_data(ttl=120)
 def load_all_cone_curves(as_of_date: date, days_forward: int) -> pd.DataFrame:
-    sql = f"""
-    SELECT
-      tenor_num,
-      cone_type,
-      rate,
-      model_type
-    FROM rate_cones
-    WHERE curve_date   = '{as_of_date}'
-      AND days_forward = {days_forward}
-    ORDER BY tenor_num, cone_type, model_type;
-    """
-    return ds.query(sql).to_pandas()
+    cones = mirror.load(ds, "rate_cones", as_of_date, as_of_date,
+                        columns=["tenor_num", "cone_type", "rate", "model_type"],
+                        where={"days_forward": float(days_forward)}, max_age=120)
+    return cones.to_pandas().sort_values(["tenor_num", "cone_type", "model_type"], ignore_index=True)
 
 # ─── App ───────────────────────────────────────────────────────────────────
 def main():
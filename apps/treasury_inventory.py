@@ -1,9 +1,15 @@
 import streamlit as st
 import pandas as pd
-from domino.data_sources import DataSourceClient
+import sys
+from pathlib import Path
 from datetime import date
 import pandas as pd
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from data.data_source import get_data_source
+from data.query import run_query
+
 def format_coupon(v):
     # If the cell is NaN, show a dash; otherwise format with two decimals + “%”
     return "–" if pd.isna(v) else f"{v:.2f}%"
@@ -20,7 +26,7 @@ st.markdown(
 # ─── Data Access Functions ───────────────────────────────────────────────────
 @st.cache_data(show_spinner=False, ttl=300)
 def get_inventory_dates() -> list[date]:
-    ds = DataSourceClient().get_datasource("market_data")
+    ds = get_data_source("market_data")
     df = (
         ds.query(
             "SELECT DISTINCT inventory_date FROM tsy_inventory ORDER BY inventory_date"
@@ -32,13 +38,13 @@ def get_inventory_dates() -> list[date]:
 
 @st.cache_data(show_spinner=False, ttl=300)
 def load_inventory(inv_date: date) -> pd.DataFrame:
-    ds = DataSourceClient().get_datasource("market_data")
+    ds = get_data_source("market_data")
     sql = (
         "SELECT * FROM tsy_inventory "
-        f"WHERE inventory_date = '{inv_date}' "
+        "WHERE inventory_date = :inv_date "
         "ORDER BY maturity_date"
     )
-    df = ds.query(sql).to_pandas()
+    df = run_query(ds, sql, {"inv_date": inv_date}).to_pandas()
     for col in ["issue_date", "maturity_date", "auction_date"]:
         df[col] = pd.to_datetime(df[col]).dt.date
     df.rename(columns={"int_rate": "coupon"}, inplace=True)
@@ -1,11 +1,17 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
-from domino.data_sources import DataSourceClient
+import sys
+from pathlib import Path
 from datetime import date
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from data.data_source import get_data_source
+from data.query import run_query
+
 # ─── Data access ────────────────────────────────────────────────────────────
-ds = DataSourceClient().get_datasource("market_data")
+ds = get_data_source("market_data")   # pooled, shared across sessions
 
 @st.cache_data(ttl=120)
 def get_available_dates() -> list[date]:
@@ -29,7 +35,7 @@ def load_metrics_data(
     Pull every relevant price_closedform … and price_closedform_pca* … column
     that actually exists in tsy_valuation_summary.
     """
-    sql = f"""
+    sql = """
       SELECT
         valuation_date,
         security_type,
@@ -70,10 +76,10 @@ def load_metrics_data(
         price_closedform_pca3_d200bps_qty_wavg
 
       FROM tsy_valuation_summary
-     WHERE valuation_date BETWEEN '{start_date}' AND '{end_date}'
+     WHERE valuation_date BETWEEN :start_date AND :end_date
      ORDER BY valuation_date, security_type;
     """
-    df = ds.query(sql).to_pandas()
+    df = run_query(ds, sql, {"start_date": start_date, "end_date": end_date}).to_pandas()
     if not df.empty:
         df["valuation_date"] = pd.to_datetime(df["valuation_date"])
     return df
@@ -0,0 +1,165 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from data.query import array_literal, direct_pool
+
+
+class TableSpec:
+    """
+    Column types and merge rule of a table loaded through bulk_upsert().
+
+      columns    {column: Postgres type} in load order
+      key        conflict target (the table's unique key)
+      update     columns overwritten on conflict (default: every non-key column);
+                 empty → ON CONFLICT DO NOTHING
+      set_extra  extra assignments on conflict, e.g. "updated_at=CURRENT_TIMESTAMP"
+    """
+
+    def __init__(self, name, columns, key, update=None, set_extra=()):
+        self.name = name
+        self.columns = dict(columns)
+        self.key = tuple(key)
+        self.update = tuple(c for c in self.columns if c not in self.key) if update is None else tuple(update)
+        self.set_extra = tuple(set_extra)
+
+    def merge_sql(self, source):
+        """INSERT … SELECT from source (a staging table or an unnest(...) expression) + ON CONFLICT."""
+        cols = ", ".join(self.columns)
+        if self.update:
+            sets = ",\n      ".join([f"{c}=EXCLUDED.{c}" for c in self.update] + list(self.set_extra))
+            conflict = f"ON CONFLICT ({', '.join(self.key)}) DO UPDATE SET\n      {sets}"
+        else:
+            conflict = "ON CONFLICT DO NOTHING"
+        return f"""
+    INSERT INTO {self.name} ({cols})
+    SELECT {cols} FROM {source}
+    {conflict};
+    """
+
+
+_VALUATION_FLOATS = (
+    ["entry_price", "coupon", "time_to_maturity", "dv01"]
+    + [f"krd{t}y" for t in (1, 2, 3, 5, 7, 10, 20, 30)]
+    + ["price_closedform"]
+    + [f"price_closedform_{s}{b}bps" for b in (25, 100, 200) for s in ("u", "d")]
+    + [f"price_closedform_pca{k}_{s}{b}bps" for b in (25, 100, 200) for k in (1, 2, 3) for s in ("u", "d")]
+    + ["pca1_dv01", "pca2_dv01", "pca3_dv01", "quantity", "clean_price_closedform", "accrued_interest_closedform"]
+)
+
+TABLES = {
+    "tsy_valuations": TableSpec(
+        "tsy_valuations",
+        {"cusip": "text", "valuation_date": "date", "maturity_date": "date",
+         **{c: "float8" for c in _VALUATION_FLOATS}},
+        key=("cusip", "valuation_date"),
+        set_extra=("updated_at=CURRENT_TIMESTAMP",),
+    ),
+    "rate_curves": TableSpec(
+        "rate_curves",
+        {"curve_type": "text", "curve_date": "date", "tenor_str": "text", "rate": "float8", "tenor_num": "float8"},
+        key=("curve_type", "curve_date", "tenor_str"),
+        set_extra=("inserted_at=CLOCK_TIMESTAMP()",),      # revisions move the mirror watermark
+    ),
+    "rate_cones": TableSpec(
+        "rate_cones",
+        {"curve_type": "text", "days_forward": "float8", "curve_date": "date", "cone_type": "text",
+         "tenor_str": "text", "rate": "float8", "tenor_num": "float8", "model_type": "text"},
+        key=(),
+        update=(),
+    ),
+}
+
+
+# ─── column encoding ──────────────────────────────────────────────────────────
+def _column(values, pg_type, n):
+    """One input column as a length-n typed array (broadcasting scalars)."""
+    if np.ndim(values) == 0:
+        values = [values] * n
+    if pg_type == "float8":
+        return np.asarray(values, dtype=float)
+    if pg_type == "date":
+        return np.asarray(pd.to_datetime(values), dtype='datetime64[D]')
+    return np.asarray(values, dtype=object)
+
+
+def _python_rows(cols, types):
+    """Row tuples of native Python values for COPY (datetime64 → date, NaT → None)."""
+    return zip(*(col.astype(object).tolist() if t == "date" else col.tolist() for col, t in zip(cols, types)))
+
+
+# ─── transports ───────────────────────────────────────────────────────────────
+def _load_copy(spec, cols, pool):
+    """
+    Binary COPY into a session temp table, then one merge statement, in one transaction on a
+    pooled connection.
+    """
+    stage = f"_stage_{spec.name}"
+    types = list(spec.columns.values())
+    with pool.connection() as conn, conn.transaction(), conn.cursor() as cur:
+        cur.execute(f"CREATE TEMP TABLE {stage} ("
+                    + ", ".join(f"{c} {t}" for c, t in spec.columns.items()) + ") ON COMMIT DROP")
+        with cur.copy(f"COPY {stage} ({', '.join(spec.columns)}) FROM STDIN (FORMAT BINARY)") as copy:
+            copy.set_types(types)
+            for row in _python_rows(cols, types):
+                copy.write_row(row)
+        cur.execute(spec.merge_sql(stage))
+
+
+def _load_unnest(ds, spec, cols, chunk_rows):
+    """
+    Through the data source client: one statement per chunk that unnests one typed array per
+    column and merges it — no per-row VALUES tuples.
+    """
+    types = list(spec.columns.values())
+    n = len(cols[0])
+    for lo in range(0, n, chunk_rows):
+        arrays = ",\n      ".join(array_literal(c[lo:lo + chunk_rows], t) for c, t in zip(cols, types))
+        source = f"unnest(\n      {arrays}\n    ) AS s({', '.join(spec.columns)})"
+        ds.query(spec.merge_sql(source))
+
+
+def bulk_upsert(ds, table, data, transport="auto", chunk_rows=20_000, verbose=False):
+    """
+    Load rows into a table of TABLES and merge them with a single upsert per chunk.
+
+      data       DataFrame or {column: array or scalar} with every column of the table's spec
+      transport  "copy"   — binary COPY into a temp staging table (needs psycopg + MARKET_DATA_DSN)
+                 "unnest" — typed array parameters through ds.query (any data source client)
+                 "auto"   — copy when available, else unnest
+      verbose    print a one-line summary (callers in loops leave it off and use the stats)
+
+    Returns:
+      {"table", "rows", "seconds", "rows_per_sec", "transport"}
+    """
+    spec = TABLES[table]
+    if isinstance(data, pd.DataFrame):
+        data = {c: data[c].to_numpy() for c in spec.columns if c in data}
+    missing = [c for c in spec.columns if c not in data]
+    if missing:
+        raise ValueError(f"bulk_upsert({table}): missing columns {missing}")
+    n = max((len(v) for v in data.values() if np.ndim(v)), default=1)
+    cols = [_column(data[c], t, n) for c, t in spec.columns.items()]
+
+    pool = direct_pool(ds)
+    if transport == "auto":
+        transport = "copy" if pool is not None else "unnest"
+
+    t0 = time.perf_counter()
+    if n:
+        if transport == "copy":
+            if pool is None:
+                raise RuntimeError("COPY transport needs psycopg installed and MARKET_DATA_DSN set")
+            _load_copy(spec, cols, pool)
+        elif transport == "unnest":
+            _load_unnest(ds, spec, cols, chunk_rows)
+        else:
+            raise ValueError(f"Unknown transport '{transport}' (expected 'copy', 'unnest' or 'auto')")
+    seconds = time.perf_counter() - t0
+
+    stats = {"table": table, "rows": n, "seconds": seconds,
+             "rows_per_sec": n / seconds if seconds > 0 else float("inf"), "transport": transport}
+    if verbose:
+        print(f"📦 {table}: {n:,} rows in {seconds:.2f}s ({stats['rows_per_sec']:,.0f} rows/s, {transport})")
+    return stats
@@ -0,0 +1,111 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from data.query import run_query
+
+_NAT = np.iinfo(np.int64).min
+
+
+# ─── Arrow results ────────────────────────────────────────────────────────────
+def to_arrow(result) -> pa.Table:
+    """
+    A query result as an Arrow table, without a pandas round trip when the result can give
+    one directly (data source results stream Arrow record batches through .reader).
+    """
+    if hasattr(result, "to_arrow"):
+        return result.to_arrow()
+    reader = getattr(result, "reader", None)
+    if reader is not None:
+        return reader.read_all()
+    return pa.Table.from_pandas(result.to_pandas(), preserve_index=False)
+
+
+def _normalize(col: pa.ChunkedArray, target=None) -> pa.ChunkedArray:
+    """date64 / timestamp-at-midnight dates → date32, decimals / ints → float64 (or cast to target)."""
+    if target is not None:
+        return col.cast(target)
+    t = col.type
+    if pa.types.is_date64(t):
+        return col.cast(pa.date32())
+    if pa.types.is_decimal(t):
+        return col.cast(pa.float64())
+    return col
+
+
+def query_arrow(ds, sql, params=None, types=None) -> pa.Table:
+    """
+    run_query() as an Arrow table with normalized column types: dates as date32, numeric as
+    float64. types={column: pa type} casts columns explicitly (e.g. {"rate": pa.float64()}).
+    """
+    table = to_arrow(run_query(ds, sql, params))
+    types = types or {}
+    return pa.table({name: _normalize(table.column(name), types.get(name)) for name in table.column_names})
+
+
+def column_to_numpy(col) -> np.ndarray:
+    """
+    One Arrow column as a NumPy array: date32 → datetime64[D] (NaT for nulls), floats → float64
+    (NaN for nulls), timestamps → datetime64, anything else → object / native dtype.
+    """
+    t = col.type
+    if pa.types.is_date32(t):
+        days = pc.fill_null(col.cast(pa.int32()).cast(pa.int64()), _NAT)
+        return days.to_numpy().view('datetime64[D]')
+    if pa.types.is_floating(t) or pa.types.is_integer(t):
+        if col.null_count:
+            return pc.fill_null(col.cast(pa.float64()), np.nan).to_numpy()
+        return col.to_numpy()
+    return col.to_numpy()
+
+
+def query_columns(ds, sql, params=None, types=None) -> dict:
+    """run_query() as {column: NumPy array}, typed as in column_to_numpy — no DataFrame built."""
+    table = query_arrow(ds, sql, params, types)
+    return {name: column_to_numpy(table.column(name)) for name in table.column_names}
+
+
+# ─── pivots ───────────────────────────────────────────────────────────────────
+def pivot_matrix(rows, cols, values, row_labels=None, col_labels=None):
+    """
+    Dense (rows × cols) matrix of long-format values, e.g. (curve_date, tenor_num, rate) →
+    (dates × tenors). Labels default to the sorted unique keys; given labels fix the axis
+    (keys not among them are dropped, like DataFrame.reindex). Missing cells are NaN; on a
+    duplicated (row, col) the last value wins.
+
+    Returns:
+      row_labels, col_labels, matrix
+    """
+    rows, cols = np.asarray(rows), np.asarray(cols)
+    values = np.asarray(values, dtype=float)
+    keep = np.ones(len(values), dtype=bool)
+
+    def locate(keys, labels):
+        if labels is None:
+            labels, idx = np.unique(keys, return_inverse=True)
+            return labels, idx.reshape(-1)
+        labels = np.asarray(labels)
+        order = np.argsort(labels, kind='stable')
+        pos = np.clip(np.searchsorted(labels[order], keys), 0, len(labels) - 1)
+        keep[:] &= labels[order][pos] == keys
+        return labels, order[pos]
+
+    row_labels, r = locate(rows, row_labels)
+    col_labels, c = locate(cols, col_labels)
+    matrix = np.full((len(row_labels), len(col_labels)), np.nan)
+    matrix[r[keep], c[keep]] = values[keep]
+    return row_labels, col_labels, matrix
+
+
+def ffill(matrix, axis=0):
+    """Forward-fill NaNs along axis (like DataFrame.ffill) with one maximum.accumulate."""
+    m = np.moveaxis(np.asarray(matrix, dtype=float), axis, 0)
+    idx = np.where(np.isnan(m), 0, np.arange(len(m)).reshape((-1,) + (1,) * (m.ndim - 1)))
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    filled = np.take_along_axis(m, idx, axis=0)
+    return np.moveaxis(filled, 0, axis)
+
+
+def bfill(matrix, axis=0):
+    """Backward-fill NaNs along axis (like DataFrame.bfill)."""
+    return np.flip(ffill(np.flip(matrix, axis=axis), axis=axis), axis=axis)
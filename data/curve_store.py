@@ -0,0 +1,183 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data import mirror
+from models.curve import Curve
+
+CURVE_TYPE = 'US Treasury Par'
+
+
+def _to_day(d):
+    return np.datetime64(pd.Timestamp(d).date(), 'D')
+
+
+class CurveStore:
+    """
+    In-memory history of one curve type as a dense (dates × tenors) float array.
+
+      dates   (n_dates,)           datetime64[D], ascending
+      tenors  (n_tenors,)          tenor_num, ascending
+      rates   (n_dates × n_tenors) rate in percent, NaN where a tenor was not quoted
+
+    A date range is loaded in one read of the local Parquet mirror (data.mirror; synced first
+    if stale, or queried directly when the mirror is off); refresh() appends only dates newer
+    than the last one held. Lookups are searchsorted on the date index, so they never touch
+    the database.
+
+    The three arrays are published together as one (dates, tenors, rates) tuple and never
+    modified in place: a load swaps in a new tuple in a single assignment, so a store shared
+    across threads (e.g. a Streamlit cache_resource) can be read without locking while another
+    thread refreshes it. Each lookup works on the one snapshot it read first.
+    """
+
+    def __init__(self, data_source, curve_type=CURVE_TYPE, tenors=None):
+        self.data_source = data_source
+        self.curve_type = curve_type
+        self._fixed_tenors = None if tenors is None else np.sort(np.asarray(tenors, dtype=float))
+        tenors = self._fixed_tenors if self._fixed_tenors is not None else np.array([], dtype=float)
+        self._snapshot = (np.array([], dtype='datetime64[D]'), tenors, np.empty((0, len(tenors)), dtype=float))
+        self._lock = threading.Lock()       # serializes writers; readers use the current snapshot
+
+    @classmethod
+    def load(cls, data_source, start_date, end_date, curve_type=CURVE_TYPE, tenors=None):
+        store = cls(data_source, curve_type=curve_type, tenors=tenors)
+        store.load_range(start_date, end_date)
+        return store
+
+    @property
+    def dates(self):
+        return self._snapshot[0]
+
+    @property
+    def tenors(self):
+        return self._snapshot[1]
+
+    @property
+    def rates(self):
+        return self._snapshot[2]
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __contains__(self, d):
+        dates = self.dates
+        i = np.searchsorted(dates, _to_day(d))
+        return i < len(dates) and dates[i] == _to_day(d)
+
+    # ─── loading ──────────────────────────────────────────────────────────────
+    def _query(self, start_date, end_date):
+        rows = mirror.load(self.data_source, "rate_curves", start_date, end_date,
+                           columns=["curve_date", "tenor_num", "rate"], where={"curve_type": self.curve_type})
+        return rows.to_pandas().dropna(subset=["rate"])
+
+    def _to_dense(self, df):
+        dates, d_idx = np.unique(pd.to_datetime(df["curve_date"]).to_numpy().astype('datetime64[D]'),
+                                 return_inverse=True)
+        tenor_num = df["tenor_num"].to_numpy(dtype=float)
+        rate = df["rate"].to_numpy(dtype=float)
+
+        if self._fixed_tenors is not None:
+            tenors = self._fixed_tenors
+            # match on closeness: tenor_num is stored as e.g. 30/360 for "1 Mo"
+            t_idx = np.clip(np.searchsorted(tenors, tenor_num), 0, len(tenors) - 1)
+            t_prev = np.clip(t_idx - 1, 0, len(tenors) - 1)
+            t_idx = np.where(np.abs(tenors[t_prev] - tenor_num) < np.abs(tenors[t_idx] - tenor_num), t_prev, t_idx)
+            keep = np.isclose(tenors[t_idx], tenor_num)
+            d_idx, t_idx, rate = d_idx.reshape(-1)[keep], t_idx[keep], rate[keep]
+        else:
+            tenors, t_idx = np.unique(tenor_num, return_inverse=True)
+            d_idx = d_idx.reshape(-1)
+
+        rates = np.full((len(dates), len(tenors)), np.nan)
+        rates[d_idx, t_idx.reshape(-1)] = rate
+        return dates, tenors, rates
+
+    def _merge(self, dates, tenors, rates):
+        """Union the new block into the store (newer values win on overlapping dates) and publish it."""
+        held_dates, held_tenors, held_rates = self._snapshot
+        all_tenors = np.union1d(held_tenors, tenors)
+        all_dates = np.union1d(held_dates, dates)
+        merged = np.full((len(all_dates), len(all_tenors)), np.nan)
+        merged[np.ix_(np.searchsorted(all_dates, held_dates), np.searchsorted(all_tenors, held_tenors))] = held_rates
+        merged[np.ix_(np.searchsorted(all_dates, dates), np.searchsorted(all_tenors, tenors))] = rates
+        for a in (all_dates, all_tenors, merged):
+            a.flags.writeable = False
+        self._snapshot = (all_dates, all_tenors, merged)
+
+    def load_range(self, start_date, end_date):
+        """Load [start_date, end_date] in a single query and merge it into the store."""
+        df = self._query(pd.Timestamp(start_date).date(), pd.Timestamp(end_date).date())
+        if df.empty:
+            return 0
+        block = self._to_dense(df)
+        with self._lock:
+            self._merge(*block)
+        return len(block[0])
+
+    def refresh(self, end_date=None):
+        """Incrementally fetch dates after the last one held (up to end_date, default today)."""
+        dates = self.dates
+        if not len(dates):
+            raise ValueError("CurveStore is empty; call load_range() before refresh()")
+        start = (dates[-1] + 1).astype(object)
+        end = pd.Timestamp(end_date).date() if end_date is not None else pd.Timestamp.today().date()
+        if start > end:
+            return 0
+        return self.load_range(start, end)
+
+    # ─── lookups ──────────────────────────────────────────────────────────────
+    def _row(self, snapshot, d):
+        dates, _, rates = snapshot
+        day = _to_day(d)
+        i = np.searchsorted(dates, day)
+        if i == len(dates) or dates[i] != day:
+            raise KeyError(f"No {self.curve_type} curve for {day}")
+        return rates[i]
+
+    def get(self, d):
+        """Rates (n_tenors,) on exactly date d; KeyError if that date is not held."""
+        return self._row(self._snapshot, d)
+
+    def as_of(self, d):
+        """(curve_date, rates) for the last date on or before d (snap back to last available)."""
+        dates, _, rates = self._snapshot
+        i = np.searchsorted(dates, _to_day(d), side='right') - 1
+        if i < 0:
+            raise KeyError(f"No {self.curve_type} curve on or before {_to_day(d)}")
+        return dates[i].astype(object), rates[i]
+
+    def _window(self, snapshot, start_date, end_date):
+        dates, _, rates = snapshot
+        lo = np.searchsorted(dates, _to_day(start_date), side='left')
+        hi = np.searchsorted(dates, _to_day(end_date), side='right')
+        return dates[lo:hi], rates[lo:hi]
+
+    def window(self, start_date, end_date):
+        """(dates, rates) for every held date in [start_date, end_date] — a view, not a copy."""
+        return self._window(self._snapshot, start_date, end_date)
+
+    def frame(self, start_date=None, end_date=None):
+        """
+        Date × tenor DataFrame (index curve_date as Timestamps, columns tenor_num) over the
+        store's read-only arrays: derive new frames from it, or .copy() before editing in place.
+        """
+        snapshot = self._snapshot
+        start = snapshot[0][0] if start_date is None else start_date
+        end = snapshot[0][-1] if end_date is None else end_date
+        dates, rates = self._window(snapshot, start, end)
+        return pd.DataFrame(rates, index=pd.DatetimeIndex(dates, name="curve_date"),
+                            columns=pd.Index(snapshot[1], name="tenor_num"))
+
+    def quoted(self, d):
+        """(tenor_num, rate) arrays of the tenors quoted on exactly date d."""
+        snapshot = self._snapshot
+        row = self._row(snapshot, d)
+        quoted = ~np.isnan(row)
+        return snapshot[1][quoted], row[quoted]
+
+    def curve(self, d, method="linear"):
+        """Curve over the tenors quoted on exactly date d (same construction as get_yield_curve)."""
+        tenors, rates = self.quoted(d)
+        return Curve(tenors, rates, method=method, extrapolate="linear")
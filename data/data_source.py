@@ -1,8 +1,16 @@
 import os
+import threading
+import time
+from contextlib import contextmanager
 from domino.data_sources import DataSourceClient
 import sys
 from pathlib import Path
 
+try:
+    import psycopg                      # optional: direct Postgres access (COPY, bind parameters)
+except ImportError:
+    psycopg = None
+
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from config import env
@@ -15,6 +23,161 @@ datasource_mappings = {
     'sandbox':    'market_data'
 }
 
-def get_data_source():
-    print(f'getting data source for {env}')
-    return DataSourceClient().get_datasource(datasource_mappings.get(env))
\ No newline at end of file
+# libpq connection string of the market data database; enables the direct psycopg paths
+MARKET_DATA_DSN = os.environ.get('MARKET_DATA_DSN')
+
+# most queries in flight at once per process (Streamlit sessions + populate-job worker threads)
+MAX_CLIENTS = int(os.environ.get('DATA_SOURCE_MAX_CLIENTS', 8))
+
+
+class DataSourcePool:
+    """
+    Reusable data source clients — and, with MARKET_DATA_DSN, psycopg connections — shared by
+    every thread of the process.
+
+      • a client / connection is checked out by one thread at a time and returned to the pool
+        afterwards, so setup happens at most max_clients times instead of once per call
+      • nested checkouts on the same thread reuse that thread's client / connection and its
+        slot (no self-deadlock)
+      • at most max_clients checkouts (clients and connections together) are in flight; further
+        callers wait, and the wait is recorded (see stats() / report())
+
+    Use checkout() to run several queries on one client, connection() for direct psycopg access,
+    or the PooledDataSource returned by get_data_source(), whose .query() checks a client out per call.
+    """
+
+    def __init__(self, name, max_clients=MAX_CLIENTS, dsn=None):
+        self.name = name
+        self.max_clients = max_clients
+        self.dsn = dsn or MARKET_DATA_DSN
+        self._slots = threading.BoundedSemaphore(max_clients)
+        self._idle = {"client": [], "conn": []}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._created = {"client": 0, "conn": 0}
+        self._checkouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _new_client(self):
+        return DataSourceClient().get_datasource(self.name)
+
+    def _new_connection(self):
+        # autocommit: each statement stands alone unless the caller opens conn.transaction()
+        return psycopg.connect(self.dsn, autocommit=True)
+
+    @contextmanager
+    def _slot(self):
+        """One of the max_clients slots for this thread; nested checkouts reuse the thread's slot."""
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            self._local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth = depth
+            return
+
+        t0 = time.perf_counter()
+        self._slots.acquire()
+        waited = time.perf_counter() - t0
+        with self._lock:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        self._local.depth = 1
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+            self._slots.release()
+
+    @contextmanager
+    def _borrow(self, kind, new):
+        held = getattr(self._local, kind, None)
+        if held is not None:
+            yield held
+            return
+
+        with self._slot():
+            with self._lock:
+                idle = self._idle[kind]
+                item = idle.pop() if idle else None
+            if item is None or getattr(item, "closed", False):
+                item = new()
+                with self._lock:
+                    self._created[kind] += 1
+            setattr(self._local, kind, item)
+            try:
+                yield item
+            finally:
+                setattr(self._local, kind, None)
+                with self._lock:
+                    self._idle[kind].append(item)
+
+    def checkout(self):
+        """Context manager: a data source client for this thread."""
+        return self._borrow("client", self._new_client)
+
+    def connection(self):
+        """
+        Context manager: a psycopg connection to the pool's DSN for this thread, under the same
+        max_clients cap as checkout(). Connections are kept open between checkouts, so what
+        psycopg caches per connection (prepared statements) carries over.
+        """
+        if psycopg is None or not self.dsn:
+            raise RuntimeError("Direct connections need psycopg installed and MARKET_DATA_DSN set")
+        return self._borrow("conn", self._new_connection)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "clients_created": self._created["client"],
+                "connections_created": self._created["conn"],
+                "checkouts": self._checkouts,
+                "wait_total_s": self._wait_total,
+                "wait_max_s": self._wait_max,
+                "wait_mean_ms": 1000 * self._wait_total / self._checkouts if self._checkouts else 0.0,
+            }
+
+    def report(self):
+        s = self.stats()
+        conns = f" + {s['connections_created']} connections" if s["connections_created"] else ""
+        print(f"🔌 {self.name}: {s['checkouts']} checkouts on {s['clients_created']} clients{conns} "
+              f"(cap {self.max_clients}), wait mean {s['wait_mean_ms']:.1f} ms / max {1000 * s['wait_max_s']:.1f} ms")
+        return s
+
+
+class PooledDataSource:
+    """Drop-in for a data source client: every call borrows a pooled client for its duration."""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def query(self, *args, **kwargs):
+        with self.pool.checkout() as client:
+            return client.query(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        def call(*args, **kwargs):
+            with self.pool.checkout() as client:
+                return getattr(client, attr)(*args, **kwargs)
+        return call
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name=None):
+    """The process-wide DataSourcePool of a data source (default: the one mapped to env)."""
+    name = name or datasource_mappings.get(env)
+    with _pools_lock:
+        if name not in _pools:
+            print(f'getting data source for {env}')
+            _pools[name] = DataSourcePool(name)
+        return _pools[name]
+
+
+def get_data_source(name=None):
+    return PooledDataSource(get_pool(name))
@@ -0,0 +1,377 @@
+import datetime as dt
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+try:
+    import fcntl                        # POSIX: sync lock shared by every process using the mirror
+except ImportError:
+    fcntl = None
+
+from data.columnar import column_to_numpy, query_arrow
+
+# local Parquet mirror root, opt-in: unset or empty, every read queries the database. The first
+# sync of a table copies all of it, so point this at a warmed, shared directory (e.g.
+# ~/.cache/market_data_mirror after a populate job) rather than enabling it cold in an app
+_root = os.environ.get('MARKET_DATA_MIRROR', '')
+MIRROR_DIR = Path(_root) if _root else None
+
+# a mirror synced less than this many seconds ago is read without asking the database for new rows
+MIRROR_MAX_AGE = float(os.environ.get('MARKET_DATA_MIRROR_MAX_AGE', 300))
+
+# fallback re-fetch window when other sessions' transactions are hidden from us (no
+# pg_read_all_stats, see _open_write_horizon): must exceed the longest writer transaction
+SYNC_OVERLAP = dt.timedelta(seconds=float(os.environ.get('MARKET_DATA_MIRROR_OVERLAP', 3600)))
+
+# a superseded generation directory is deleted this many seconds after a full resync replaced it
+RETIRED_GRACE = 3600
+
+
+class MirrorSpec:
+    """
+    How one table is mirrored.
+
+      date_column   partitions the files by year and answers start_date / end_date reads
+      watermark     timestamp set whenever a row is written (insert or upsert)
+      key           the table's primary key; on overlap the most recently fetched row wins
+      json_columns  JSONB columns, stored as JSON text
+    """
+
+    def __init__(self, name, date_column, watermark, key, json_columns=()):
+        self.name = name
+        self.date_column = date_column
+        self.watermark = watermark
+        self.key = tuple(key)
+        self.json_columns = tuple(json_columns)
+
+
+MIRRORS = {
+    "rate_curves": MirrorSpec("rate_curves", "curve_date", "inserted_at",
+                              key=("curve_type", "curve_date", "tenor_str")),
+    "reference_rates": MirrorSpec("reference_rates", "rate_date", "inserted_at",
+                                  key=("rate_ticker", "rate_type", "rate_date")),
+    "pca_results": MirrorSpec("pca_results", "curve_date", "run_timestamp",
+                              key=("curve_type", "curve_date"), json_columns=("components",)),
+    "rate_cones": MirrorSpec("rate_cones", "curve_date", "inserted_at",
+                             key=("curve_type", "model_type", "cone_type", "days_forward", "curve_date", "tenor_str")),
+}
+
+_locks = {name: threading.Lock() for name in MIRRORS}
+
+
+# ─── files ────────────────────────────────────────────────────────────────────
+#   <root>/<table>/_sync.json                          state, naming the current generation
+#   <root>/<table>/<generation>/year=YYYY/part.parquet  partitions
+#
+# Files are only ever replaced whole (os.replace), and a full resync writes a new generation
+# and switches _sync.json to it, so a reader never sees a partial file or a deleted directory.
+def _table_dir(table, root=None):
+    return Path(root or MIRROR_DIR) / table
+
+
+def _partitions(directory):
+    """{year: path} of the partition files of a generation directory (None → none)."""
+    if directory is None:
+        return {}
+    return {int(p.parent.name.split("=", 1)[1]): p
+            for p in sorted(Path(directory).glob("year=*/part.parquet"))}
+
+
+def _read_state(table, root=None):
+    """The table's sync state, or None if it was never synced (or by an older layout)."""
+    path = _table_dir(table, root) / "_sync.json"
+    if not path.exists():
+        return None
+    state = json.loads(path.read_text())
+    if "generation" not in state:
+        return None
+    for name in ("watermark", "since"):
+        state[name] = state[name] and dt.datetime.fromisoformat(state[name])
+    return state
+
+
+def _current_dir(table, root=None):
+    state = _read_state(table, root)
+    return None if state is None else _table_dir(table, root) / state["generation"]
+
+
+def _replace(path, write):
+    """write(file) into a uniquely named temp file next to path, then atomically move it over path."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False)
+    try:
+        with tmp:
+            write(tmp)
+        os.replace(tmp.name, path)
+    except BaseException:
+        Path(tmp.name).unlink(missing_ok=True)
+        raise
+
+
+def _write_state(table, state, root=None):
+    state = {k: v.isoformat() if isinstance(v, dt.datetime) else v for k, v in state.items()}
+    _replace(_table_dir(table, root) / "_sync.json", lambda f: f.write(json.dumps(state).encode()))
+
+
+def _write_partition(path, table):
+    """Atomic replace, so readers (and open memory maps) only ever see a whole file."""
+    _replace(path, lambda f: pq.write_table(table, f))
+
+
+def _retire_generations(table, current, root=None):
+    """
+    Mark every generation directory but current as retired, and delete those retired more than
+    RETIRED_GRACE seconds ago — long after any reader that listed their files has opened them.
+    """
+    for directory in _table_dir(table, root).iterdir():
+        if not directory.is_dir() or directory.name == current:
+            continue
+        marker = directory / "_retired"
+        if not marker.exists():
+            marker.touch()
+        elif time.time() - marker.stat().st_mtime > RETIRED_GRACE:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+@contextmanager
+def _sync_lock(table, root=None):
+    """Exclusive per table: threads through _locks, processes through flock on <table>/.lock."""
+    with _locks[table]:
+        directory = _table_dir(table, root)
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / ".lock", "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield                                      # closing the file releases the flock
+
+
+# ─── sync ─────────────────────────────────────────────────────────────────────
+def _normalize(spec, table):
+    """Stable column types across sync paths: date32 dates, UTC watermark, JSON text."""
+    columns = {}
+    for name in table.column_names:
+        col = table.column(name)
+        if name == spec.date_column and not pa.types.is_date32(col.type):
+            col = col.cast(pa.date32())
+        elif name == spec.watermark:
+            col = col.cast(pa.timestamp("us", tz="UTC"))
+        elif name in spec.json_columns and not pa.types.is_string(col.type):
+            col = pa.array([None if v is None else json.dumps(v) for v in col.to_pylist()], pa.string())
+        columns[name] = col
+    return pa.table(columns)
+
+
+def _latest_by_key(spec, table):
+    """One row per key (the last one), sorted by date."""
+    rows = table.append_column("_row", pa.array(np.arange(table.num_rows)))
+    last = rows.group_by(list(spec.key)).aggregate([("_row", "max")])
+    return table.take(last["_row_max"]).sort_by([(spec.date_column, "ascending")])
+
+
+def _partition_rows(directory):
+    """{year: row count} of a generation, from the Parquet footers."""
+    return {year: pq.ParquetFile(p).metadata.num_rows for year, p in _partitions(directory).items()}
+
+
+def _merge(spec, fresh, directory):
+    """Fold fetched rows into the year partitions of a generation."""
+    fresh = _normalize(spec, fresh)
+    parts = _partitions(directory)
+    years = pc.year(fresh.column(spec.date_column))
+    for year in pc.unique(years).to_pylist():
+        block = fresh.filter(pc.equal(years, year))
+        path = parts.get(year, directory / f"year={year}" / "part.parquet")
+        if path.exists():
+            held = pq.read_table(path)
+            # permissive: an all-NULL column (null type) takes the type of the other side
+            block = pa.concat_tables([held, block.select(held.column_names)], promote_options="permissive")
+        _write_partition(path, _latest_by_key(spec, block))
+
+
+def _open_write_horizon(ds):
+    """
+    Server time before which no row can still become visible: the start of the oldest
+    transaction open right now (any row it writes is stamped at or after its start, by
+    CURRENT_TIMESTAMP or clock_timestamp()), or now when none is. None when other roles'
+    sessions are hidden from us (no pg_read_all_stats) — the caller falls back to SYNC_OVERLAP.
+    """
+    head = query_arrow(ds, """
+        SELECT clock_timestamp() AS now,
+               min(xact_start) AS oldest,
+               count(*) FILTER (WHERE query = '<insufficient privilege>') AS hidden
+        FROM pg_stat_activity
+        WHERE pid <> pg_backend_pid() AND datname = current_database()""")
+    if int(head.column("hidden")[0].as_py()):
+        return None
+    now, oldest = (head.column(c).cast(pa.timestamp("us", tz="UTC"))[0].as_py() for c in ("now", "oldest"))
+    return now if oldest is None else min(now, oldest)
+
+
+def sync(ds, table, full=False, root=None, verbose=True):
+    """
+    Bring the local mirror of table up to date.
+
+      • incremental: fetch only rows stamped since the last sync's horizon (the start of the
+        oldest transaction still open then, or the watermark minus SYNC_OVERLAP when that can't
+        be seen) and merge them into their year partitions by primary key
+      • full: re-fetch everything into a new generation directory — on the first sync, with
+        full=True, or when the database no longer matches the mirror (table rebuilt, rows
+        deleted: a year's row count differs)
+
+    Safe to run from several threads and processes at once (they take turns per table).
+
+    Returns:
+      {"table", "fetched", "rows", "watermark", "full", "seconds"}
+    """
+    spec = MIRRORS[table]
+    root = root or MIRROR_DIR
+    if root is None:
+        raise RuntimeError("The market data mirror is disabled (MARKET_DATA_MIRROR is not set)")
+
+    with _sync_lock(table, root):
+        t0 = time.perf_counter()
+        horizon = _open_write_horizon(ds)            # read before the rows: nothing older can still commit
+        head = query_arrow(ds, f"""
+            SELECT extract(year FROM {spec.date_column})::int AS year, count(*) AS n, max({spec.watermark}) AS wm
+            FROM {table} GROUP BY 1""")
+        remote_rows = {y: n for y, n in zip(head.column("year").to_pylist(), head.column("n").to_pylist())}
+        upto = pc.max(head.column("wm").cast(pa.timestamp("us", tz="UTC"))).as_py()
+
+        state = None if full else _read_state(table, root)
+        if state is not None and (upto is None or state["since"] is None or upto < state["watermark"]):
+            state = None                                       # table was emptied or recreated
+        fetched = 0
+        rows = 0
+        for _ in range(2):
+            generation = state["generation"] if state is not None else f"g{time.time_ns()}"
+            directory = _table_dir(table, root) / generation
+            directory.mkdir(parents=True, exist_ok=True)
+            if upto is not None:
+                where = f"{spec.watermark} <= :upto"
+                params = {"upto": upto}
+                if state is not None:
+                    where += f" AND {spec.watermark} > :since"
+                    params["since"] = state["since"]
+                fresh = query_arrow(ds, f"SELECT * FROM {table} WHERE {where}", params)
+                fetched += fresh.num_rows
+                if fresh.num_rows:
+                    _merge(spec, fresh, directory)
+            local_rows = _partition_rows(directory)
+            rows = sum(local_rows.values())
+            # Deletes are caught by per-year row counts only: deleting N rows and inserting N
+            # others within the same year goes unnoticed until the next sync(full=True).
+            if local_rows == remote_rows or state is None:
+                break
+            state = None                                       # rows were deleted upstream
+        # next incremental fetch: rows stamped after since (1 µs — timestamp resolution — below the horizon)
+        if upto is None:
+            since = None
+        elif horizon is None:
+            since = upto - SYNC_OVERLAP
+        else:
+            since = min(upto, horizon - dt.timedelta(microseconds=1))
+        _write_state(table, {"generation": generation, "watermark": upto, "since": since,
+                             "rows": rows, "synced_at": time.time()}, root)
+        _retire_generations(table, generation, root)
+        seconds = time.perf_counter() - t0
+
+    stats = {"table": table, "fetched": fetched, "rows": rows, "watermark": upto,
+             "full": state is None, "seconds": seconds}
+    if verbose:
+        print(f"💾 {table}: fetched {fetched:,} rows{' (full)' if state is None else ''}, "
+              f"{rows:,} mirrored, watermark {upto} ({seconds:.2f}s)")
+    return stats
+
+
+# ─── reads ────────────────────────────────────────────────────────────────────
+def _as_date(d):
+    """date / datetime / Timestamp / datetime64 → datetime.date (None passes through)."""
+    if d is None or type(d) is dt.date:
+        return d
+    if isinstance(d, np.datetime64):
+        return d.astype('datetime64[D]').astype(object)
+    return d.date() if isinstance(d, dt.datetime) else dt.date.fromisoformat(str(d))
+
+
+def _filters(spec, start_date, end_date, where):
+    filters = []
+    if start_date is not None:
+        filters.append((spec.date_column, ">=", start_date))
+    if end_date is not None:
+        filters.append((spec.date_column, "<=", end_date))
+    for column, value in (where or {}).items():
+        if isinstance(value, (list, tuple, np.ndarray)):
+            filters.append((column, "in", list(np.asarray(value).tolist())))
+        else:
+            filters.append((column, "==", value))
+    return filters
+
+
+def read(table, start_date=None, end_date=None, columns=None, where=None, root=None) -> pa.Table:
+    """
+    Rows of the local mirror as an Arrow table, reading only the year partitions the date
+    range touches (memory-mapped). where={column: value or list of values} filters by equality.
+    """
+    spec = MIRRORS[table]
+    start_date, end_date = _as_date(start_date), _as_date(end_date)
+    parts = _partitions(_current_dir(table, root))
+    years = [y for y in parts
+             if (start_date is None or y >= start_date.year) and (end_date is None or y <= end_date.year)]
+    filters = _filters(spec, start_date, end_date, where) or None
+    tables = [pq.read_table(parts[y], columns=columns, filters=filters, memory_map=True) for y in years]
+    if tables:
+        return pa.concat_tables(tables, promote_options="permissive")
+    if parts:
+        schema = pq.read_schema(next(iter(parts.values())))
+        return schema.empty_table().select(columns or schema.names)
+    return pa.table({c: pa.array([], pa.null()) for c in columns or []})
+
+
+def _select_sql(spec, start_date, end_date, columns, where):
+    """The database query equivalent to read(), for when the mirror is off."""
+    clauses, params = [], {}
+    if start_date is not None:
+        clauses.append(f"{spec.date_column} >= :start_date")
+        params["start_date"] = start_date
+    if end_date is not None:
+        clauses.append(f"{spec.date_column} <= :end_date")
+        params["end_date"] = end_date
+    for i, (column, value) in enumerate((where or {}).items()):
+        many = isinstance(value, (list, tuple, np.ndarray))
+        clauses.append(f"{column} = ANY(:w{i})" if many else f"{column} = :w{i}")
+        params[f"w{i}"] = value
+    sql = f"SELECT {', '.join(columns) if columns else '*'} FROM {spec.name}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    return sql + f" ORDER BY {spec.date_column}", params
+
+
+def load(ds, table, start_date=None, end_date=None, columns=None, where=None, max_age=MIRROR_MAX_AGE) -> pa.Table:
+    """
+    read() from the local mirror, syncing it first when it was last synced more than max_age
+    seconds ago (max_age=0: always check for new rows). With the mirror off, the same rows
+    are queried from the database. Rows come back in date order.
+    """
+    spec = MIRRORS[table]
+    if MIRROR_DIR is None:
+        return query_arrow(ds, *_select_sql(spec, start_date, end_date, columns, where))
+    state = _read_state(table)
+    if state is None or time.time() - state["synced_at"] > max_age:
+        sync(ds, table)
+    return read(table, start_date, end_date, columns, where)
+
+
+def load_columns(ds, table, start_date=None, end_date=None, columns=None, where=None, max_age=MIRROR_MAX_AGE) -> dict:
+    """load() as {column: NumPy array}, typed as in columnar.column_to_numpy."""
+    result = load(ds, table, start_date, end_date, columns, where, max_age)
+    return {name: column_to_numpy(result.column(name)) for name in result.column_names}
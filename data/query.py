@@ -0,0 +1,191 @@
+import datetime as dt
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data.data_source import get_pool, psycopg
+
+# :name bind markers (not :: casts or a:b); quoted strings / identifiers and comments are skipped
+_TOKENS = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?\*/|(?<![:\w]):([A-Za-z_]\w*)", re.S)
+
+_ARRAY_TYPES = {"f": "float8", "i": "int8", "u": "int8", "b": "bool", "M": "date"}
+
+
+# ─── literals ─────────────────────────────────────────────────────────────────
+def array_literal(col, pg_type):
+    """Postgres array literal '{…}'::type[] of one typed column (NULL for NaT / None)."""
+    if pg_type == "float8":
+        items = map(repr, np.asarray(col, dtype=float).tolist())      # repr round-trips float64 exactly
+    elif pg_type == "date":
+        col = np.asarray(col, dtype='datetime64[D]')
+        items = np.where(np.isnat(col), "NULL", np.datetime_as_string(col, unit='D'))
+    elif pg_type in ("int8", "bool"):
+        items = map(str, np.asarray(col).tolist())
+    else:
+        items = ("NULL" if v is None else '"' + str(v).replace('\\', '\\\\').replace('"', '\\"') + '"'
+                 for v in col)
+    body = ",".join(items).replace("'", "''")
+    return f"'{{{body}}}'::{pg_type}[]"
+
+
+def sql_literal(value):
+    """A bind value as a typed SQL literal; lists / arrays become one array literal."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, (list, tuple, np.ndarray, pd.Index, pd.Series)):
+        arr = np.asarray(value)
+        if arr.dtype == object and len(arr) and isinstance(arr[0], (dt.date, pd.Timestamp)):
+            arr = np.asarray(pd.to_datetime(arr), dtype='datetime64[D]')
+        return array_literal(arr, _ARRAY_TYPES.get(arr.dtype.kind, "text"))
+    if isinstance(value, (bool, np.bool_)):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if isinstance(value, (float, np.floating)):
+        return f"'{float(value)!r}'::float8"
+    if isinstance(value, np.datetime64):
+        value = pd.Timestamp(value)
+    if isinstance(value, dt.datetime):
+        return f"'{value.isoformat()}'::{'timestamp' if value.tzinfo is None else 'timestamptz'}"
+    if isinstance(value, dt.date):
+        return f"'{value.isoformat()}'::date"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _native(value):
+    """A bind value as psycopg adapts it: numpy → Python, arrays → lists (bound as one array)."""
+    if isinstance(value, (np.ndarray, pd.Index, pd.Series)):
+        arr = np.asarray(value)
+        if arr.dtype.kind == "M":
+            return [None if np.isnat(d) else d.astype('datetime64[D]').astype(object) for d in arr]
+        return arr.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_native(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value
+
+
+# ─── statements ───────────────────────────────────────────────────────────────
+class Statement:
+    """
+    One SQL text with :name binds, parsed once: the psycopg form (%(name)s) and the pieces to
+    render typed literals into.
+    """
+
+    def __init__(self, sql):
+        self.sql = sql
+        self._parts = []                               # text, name, text, name, …, text
+        pos = 0
+        for m in _TOKENS.finditer(sql):
+            if m.group(1) is not None:
+                self._parts += [sql[pos:m.start()], m.group(1)]
+                pos = m.end()
+        self._parts.append(sql[pos:])
+        self.names = tuple(dict.fromkeys(self._parts[1::2]))
+        pg = [p.replace("%", "%%") for p in self._parts]
+        pg[1::2] = [f"%({name})s" for name in self._parts[1::2]]
+        self.pg_sql = "".join(pg)
+
+    def render(self, params):
+        """SQL text with every bind replaced by a typed literal (quoted / escaped, never spliced)."""
+        out = list(self._parts)
+        out[1::2] = [sql_literal(params[name]) for name in self._parts[1::2]]
+        return "".join(out)
+
+
+class ParsedStatementCache:
+    """
+    Thread-safe LRU of parsed Statements keyed by SQL text. Client-side only: it saves re-parsing
+    the SQL, not server planning (that is psycopg's prepare=True on the direct path).
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._statements = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sql):
+        with self._lock:
+            stmt = self._statements.get(sql)
+            if stmt is not None:
+                self._statements.move_to_end(sql)
+                self.hits += 1
+                return stmt
+            self.misses += 1
+        stmt = Statement(sql)
+        with self._lock:
+            self._statements[sql] = stmt
+            if len(self._statements) > self.maxsize:
+                self._statements.popitem(last=False)
+        return stmt
+
+    def stats(self):
+        with self._lock:
+            return {"statements": len(self._statements), "hits": self.hits, "misses": self.misses}
+
+
+parsed_statements = ParsedStatementCache()
+
+
+# ─── execution ────────────────────────────────────────────────────────────────
+class QueryResult:
+    """Rows of a psycopg query, with the to_pandas() of a data source result."""
+
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = rows
+
+    def to_pandas(self):
+        return pd.DataFrame.from_records(self.rows, columns=self.columns)
+
+    def to_arrow(self):
+        """Columns straight from the rows (dates → date32, numeric → decimal / float64 / int64)."""
+        columns = list(zip(*self.rows)) if self.rows else [()] * len(self.columns)
+        return pa.table({c: pa.array(list(v)) for c, v in zip(self.columns, columns)})
+
+
+def direct_pool(ds):
+    """The DataSourcePool whose psycopg connections serve ds, or None without psycopg / a DSN."""
+    pool = getattr(ds, "pool", None) or get_pool()
+    return pool if psycopg is not None and pool.dsn else None
+
+
+def run_query(ds, sql, params=None):
+    """
+    Run sql with :name bind parameters, e.g.
+
+        run_query(ds, "SELECT … WHERE curve_date = :d AND tenor_num = ANY(:tenors)",
+                  {"d": as_of, "tenors": tenors})
+
+    A list / array value binds as one array parameter — write "= ANY(:x)", not "IN (:x)".
+
+      • with psycopg and MARKET_DATA_DSN: on a connection checked out from the data source
+        pool (same max_clients cap as ds.query), binds go to the server and each SQL text is
+        prepared once per pooled connection (psycopg's prepare=True), so only the values change
+      • otherwise through ds.query: binds are rendered as typed, escaped literals — the server
+        parses and plans every call; only the client-side parse is cached
+
+    Either way the SQL text is parsed once (parsed_statements). Returns an object with .to_pandas().
+    """
+    stmt = parsed_statements.get(sql)
+    params = params or {}
+    missing = [n for n in stmt.names if n not in params]
+    if missing:
+        raise KeyError(f"Missing bind parameters {missing}")
+
+    pool = direct_pool(ds)
+    if pool is not None:
+        with pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(stmt.pg_sql, {n: _native(params[n]) for n in stmt.names}, prepare=True)
+            columns = [d.name for d in cur.description] if cur.description else []
+            return QueryResult(columns, cur.fetchall() if cur.description else [])
+    return ds.query(stmt.render(params))
@@ -1,26 +1,49 @@
-from scipy.interpolate import interp1d
+from models.curve import Curve
+
+# the database helpers (data.query, data.curve_store) import the Domino SDK through
+# data.data_source, so they are imported where used: building and shocking curves needs neither
+
+def make_yield_curve(tenors, rates, method="linear"):
+    """
+    Precompiled Curve of tenor_num → rate, extrapolating beyond the quoted tenors.
+    method="linear" matches the former scipy interp1d(kind="linear", fill_value="extrapolate");
+    "monotone_cubic" and "log_df" are also available (see models.curve.Curve).
+    """
+    return Curve(tenors, rates, method=method, extrapolate="linear")
 
 def get_yield_curve(as_of_date, data_source):
     """
-    Query the rate_curves table and return a linear interpolator of tenor_num → rate.
+    Query the rate_curves table and return a linear Curve of tenor_num → rate.
     """
-    query = f"""
+    from data.query import run_query
+    query = """
     SELECT tenor_num, rate
     FROM rate_curves
     WHERE curve_type = 'US Treasury Par'
-      AND curve_date = '{as_of_date.date()}'
+      AND curve_date = :as_of
       AND rate IS NOT NULL
     ORDER BY tenor_num;
     """
-    df = data_source.query(query).to_pandas()
+    df = run_query(data_source, query, {"as_of": as_of_date.date()}).to_pandas()
 
     if df.empty:
         raise ValueError(f"No yield curve data found for {as_of_date.date()}")
 
-    # Create interpolator (you can switch to kind='cubic' if needed)
-    return interp1d(df["tenor_num"], df["rate"], kind="linear", fill_value="extrapolate")
+    return make_yield_curve(df["tenor_num"], df["rate"])
+
+def get_yield_curves(start_date, end_date, data_source):
+    """
+    Load every par curve between start_date and end_date in one query (via CurveStore).
+    Returns {curve_date (datetime.date): Curve}, built exactly like get_yield_curve.
+    """
+    from data.curve_store import CurveStore
+    store = CurveStore.load(data_source, start_date, end_date)
+    return {d.astype(object): store.curve(d) for d in store.dates}
 
 def bump_curve(base_yc, shift_bp):
+    if isinstance(base_yc, Curve):
+        # same knots → shocked copies reuse the base curve's bucket indices
+        return base_yc.shifted(shift_bp / 100.0)
     def f(t_arr):
         return base_yc(t_arr) + (shift_bp / 100.0)
     return f
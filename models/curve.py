@@ -0,0 +1,190 @@
+import numpy as np
+
+METHODS = ("linear", "monotone_cubic", "log_df")
+
+
+class TenorGrid:
+    """
+    A fixed array of times (years) whose interval lookups are memoized per knot vector.
+
+    Every Curve on the same knots (a base curve and all of its shocked copies) locates
+    the grid once; later evaluations reuse the bucket indices and offsets.
+    """
+
+    def __init__(self, t):
+        self.t = np.asarray(t, dtype=float)
+        self._locations = {}
+
+    def locate(self, knots):
+        """
+        (idx, dx, dx_flat, left, right) of self.t against knots: segment index, offset into it,
+        offset with t clamped to the knot range, and the two extrapolation masks.
+        """
+        key = knots.tobytes()
+        loc = self._locations.get(key)
+        if loc is None:
+            idx = np.clip(np.searchsorted(knots, self.t, side='right') - 1, 0, len(knots) - 2)
+            dx = self.t - knots[idx]
+            dx_flat = np.clip(self.t, knots[0], knots[-1]) - knots[idx]
+            loc = (idx, dx, dx_flat, self.t < knots[0], self.t > knots[-1])
+            self._locations[key] = loc
+        return loc
+
+
+class Curve:
+    """
+    Zero-rate curve (rates in percent) with precomputed segment coefficients.
+
+    Each segment i stores a cubic a + b·dx + c·dx² + d·dx³ in dx = t − knot_i, for:
+
+      • "linear"          : rate linear between knots
+      • "monotone_cubic"  : rate on a Fritsch–Carlson monotone Hermite cubic (PCHIP slopes)
+      • "log_df"          : log discount factor (−rate·t) linear between knots, i.e. flat forwards
+
+    Outside the knots the curve extrapolates "linear" (end-segment slope, like interp1d with
+    fill_value="extrapolate") or "flat" (end rate held, like np.interp). log_df always holds the
+    first rate flat on the left and extends the last forward rate on the right.
+
+    Curves are callables (tenor → rate %), so they drop in wherever a yield-curve function is
+    expected; rate/df/__call__ also accept a TenorGrid to reuse its bucket indices.
+    """
+
+    def __init__(self, tenors, rates, method="linear", extrapolate="linear"):
+        if method not in METHODS:
+            raise ValueError(f"Unknown curve method '{method}' (expected one of {METHODS})")
+        if extrapolate not in ("linear", "flat"):
+            raise ValueError(f"Unknown extrapolation '{extrapolate}' (expected 'linear' or 'flat')")
+
+        tenors = np.asarray(tenors, dtype=float)
+        rates = np.asarray(rates, dtype=float)
+        order = np.argsort(tenors, kind='stable')
+        self.tenors = np.ascontiguousarray(tenors[order])
+        self.rates = rates[order]
+        self.method = method
+        self.extrapolate = extrapolate
+        self._coeffs, self._end_slopes = self._build()
+
+    # ─── construction ─────────────────────────────────────────────────────────
+    def _knot_values(self):
+        return self.rates * self.tenors if self.method == "log_df" else self.rates
+
+    def _build(self):
+        x, y = self.tenors, self._knot_values()
+        h = np.diff(x)
+        delta = np.diff(y) / h
+        zeros = np.zeros_like(h)
+
+        if self.method == "monotone_cubic" and len(x) > 2:
+            m = self._pchip_slopes(h, delta)
+            c = (3 * delta - 2 * m[:-1] - m[1:]) / h
+            d = (m[:-1] + m[1:] - 2 * delta) / h ** 2
+            coeffs = np.stack([y[:-1], m[:-1], c, d])
+            end_slopes = (m[0], m[-1])
+        else:
+            coeffs = np.stack([y[:-1], delta, zeros, zeros])
+            end_slopes = (delta[0], delta[-1])
+
+        if self.method == "log_df":
+            # left: flat rate (y = r0·t, handled in _evaluate); right: last forward extended
+            end_slopes = (None, delta[-1])
+        elif self.extrapolate == "flat":
+            end_slopes = (0.0, 0.0)
+        return coeffs, end_slopes
+
+    @staticmethod
+    def _pchip_slopes(h, delta):
+        """Fritsch–Carlson knot derivatives (the scheme used by scipy's PchipInterpolator)."""
+        m = np.zeros(len(h) + 1)
+        w1, w2 = 2 * h[1:] + h[:-1], h[1:] + 2 * h[:-1]
+        same_sign = (np.sign(delta[:-1]) * np.sign(delta[1:])) > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            harmonic = (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:])
+        m[1:-1] = np.where(same_sign, harmonic, 0.0)
+
+        def end_slope(h0, h1, d0, d1):
+            s = ((2 * h0 + h1) * d0 - h0 * d1) / (h0 + h1)
+            if np.sign(s) != np.sign(d0):
+                return 0.0
+            if np.sign(d0) != np.sign(d1) and abs(s) > abs(3 * d0):
+                return 3 * d0
+            return s
+
+        m[0] = end_slope(h[0], h[1], delta[0], delta[1])
+        m[-1] = end_slope(h[-1], h[-2], delta[-1], delta[-2])
+        return m
+
+    # ─── evaluation ───────────────────────────────────────────────────────────
+    def _evaluate(self, t):
+        grid = t if isinstance(t, TenorGrid) else TenorGrid(t)
+        idx, dx, dx_flat, left, right = grid.locate(self.tenors)
+
+        if self.method == "linear":
+            # end segments extended (or clamped) cover extrapolation: two gathers and a multiply-add
+            a, b = self._coeffs[0][idx], self._coeffs[1][idx]
+            return a + b * (dx if self.extrapolate == "linear" else dx_flat)
+
+        a, b, c, d = (k[idx] for k in self._coeffs)
+        y = a + dx * (b + dx * (c + dx * d))
+
+        x, yk = self.tenors, self._knot_values()
+        s_left, s_right = self._end_slopes
+        if s_left is not None:
+            y = np.where(left, yk[0] + s_left * (grid.t - x[0]), y)
+        y = np.where(right, yk[-1] + s_right * (grid.t - x[-1]), y)
+
+        if self.method != "log_df":
+            return y
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = y / grid.t
+        return np.where(left, self.rates[0], r)
+
+    def rate(self, t):
+        """Zero rate in percent at t (array or TenorGrid)."""
+        return self._evaluate(t)
+
+    def df(self, t):
+        """Continuously compounded discount factor exp(−rate/100 · t)."""
+        tt = t.t if isinstance(t, TenorGrid) else np.asarray(t, dtype=float)
+        return np.exp(-(self._evaluate(t) / 100) * tt)
+
+    def __call__(self, t):
+        return self._evaluate(t)
+
+    # ─── shock composition ────────────────────────────────────────────────────
+    def shifted(self, shift):
+        """
+        New curve on the same knots with rates + shift (percent; scalar for parallel or one value
+        per knot). Only the O(n_knots) coefficients are rebuilt; grids keep their bucket indices.
+        """
+        return Curve(self.tenors, self.rates + np.asarray(shift, dtype=float), self.method, self.extrapolate)
+
+    def __add__(self, other):
+        return CurveSum([self, other])
+
+
+class CurveSum:
+    """Pointwise sum of curves, e.g. a base curve plus a shock curve defined on other knots."""
+
+    def __init__(self, curves):
+        self.curves = list(curves)
+
+    def rate(self, t):
+        grid = t if isinstance(t, TenorGrid) else TenorGrid(t)
+        return sum(c.rate(grid) for c in self.curves)
+
+    def df(self, t):
+        grid = t if isinstance(t, TenorGrid) else TenorGrid(t)
+        return np.exp(-(self.rate(grid) / 100) * grid.t)
+
+    def __call__(self, t):
+        return self.rate(t)
+
+    def __add__(self, other):
+        return CurveSum(self.curves + [other])
+
+
+def evaluate_curve(curve, grid):
+    """Rates of any yield-curve callable on a TenorGrid, reusing its bucket indices when it can."""
+    if isinstance(curve, (Curve, CurveSum)):
+        return curve.rate(grid)
+    return curve(grid.t)
@@ -5,6 +5,7 @@ from sklearn.covariance import EmpiricalCovariance
 
 class EmpiricalCovarianceModel(BaseEstimator):
     name = "DefaultEmpiricalCovarianceEstimator"
+    gaussian = True     # deltas are simulated as N(0, covariance_); see models.rate_cone
 
     def __init__(self):
         self._cov = None
@@ -15,6 +16,13 @@ class EmpiricalCovarianceModel(BaseEstimator):
         self._cov = ec.covariance_
         return self
 
+    @classmethod
+    def from_covariance(cls, cov, **params):
+        """A model already 'fitted' to a precomputed covariance (e.g. from RollingCovariance)."""
+        model = cls(**params)
+        model._cov = np.asarray(cov, dtype=float)
+        return model
+
     def predict(self, X):
         m, n = X.shape
         return np.repeat(self._cov[np.newaxis, :, :], repeats=m, axis=0)
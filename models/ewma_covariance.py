@@ -0,0 +1,68 @@
+import numpy as np
+
+from models.empirical_covariance import EmpiricalCovarianceModel
+
+
+class EWMACovarianceModel(EmpiricalCovarianceModel):
+    """
+    RiskMetrics-style exponentially weighted covariance of daily deltas (zero mean assumed).
+
+    The state is the decayed sums S = Σ λ^age · x xᵀ and W = Σ λ^age · 1, so a new date is the
+    rank-1 update S ← λS + x xᵀ (partial_fit) and covariance_ = S / W. NaN entries (tenors not yet
+    quoted) are left out pairwise: each (i, j) is normalized by the weight of the dates on which
+    both were observed.
+    """
+    name = "EWMACovarianceEstimator"
+
+    def __init__(self, decay=0.94):
+        super().__init__()
+        self.decay = decay
+        self._S = None
+        self._W = None
+
+    def _refresh(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._cov = np.where(self._W > 0, self._S / self._W, np.nan)
+
+    def fit(self, X, y=None):
+        """Fit from scratch: the weighted sums in closed form (weights λ^(n-1-i)), one matrix product."""
+        X = np.asarray(X, dtype=float)
+        valid = ~np.isnan(X)
+        Z = np.where(valid, X, 0.0)
+        w = self.decay ** np.arange(len(X) - 1, -1, -1, dtype=float)
+        self._S = (Z * w[:, None]).T @ Z
+        self._W = (valid * w[:, None]).T @ valid.astype(float)
+        self._refresh()
+        return self
+
+    def partial_fit(self, X, y=None):
+        """Carry the state forward over new rows, one rank-1 update per row."""
+        for x in np.atleast_2d(np.asarray(X, dtype=float)):
+            self._update(x)
+        self._refresh()
+        return self
+
+    def _update(self, x):
+        valid = ~np.isnan(x)
+        z = np.where(valid, x, 0.0)
+        if self._S is None:
+            self._S = np.zeros((len(x), len(x)))
+            self._W = np.zeros((len(x), len(x)))
+        self._S *= self.decay
+        self._S += np.outer(z, z)
+        self._W *= self.decay
+        self._W += np.outer(valid, valid)
+
+    def covariance_path(self, X):
+        """
+        partial_fit over X, returning the covariance after every row: (n_rows, f, f).
+        A whole backfill's EWMA states in one pass.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        path = np.empty((len(X), X.shape[1], X.shape[1]))
+        for i, x in enumerate(X):
+            self._update(x)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                path[i] = np.where(self._W > 0, self._S / self._W, np.nan)
+        self._cov = path[-1] if len(X) else self._cov
+        return path
@@ -0,0 +1,18 @@
+from sklearn.covariance import LedoitWolf
+
+from models.empirical_covariance import EmpiricalCovarianceModel
+
+
+class LedoitWolfCovarianceModel(EmpiricalCovarianceModel):
+    """Ledoit–Wolf shrinkage of the sample covariance toward a scaled identity."""
+    name = "LedoitWolfCovarianceEstimator"
+
+    def __init__(self):
+        super().__init__()
+        self.shrinkage_ = None
+
+    def fit(self, X, y=None):
+        lw = LedoitWolf().fit(X)
+        self._cov = lw.covariance_
+        self.shrinkage_ = lw.shrinkage_
+        return self
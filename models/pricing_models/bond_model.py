@@ -1,6 +1,10 @@
 import pandas as pd
 import numpy as np
 
+from models.curve import TenorGrid, evaluate_curve
+from models.pricing_models.bond_portfolio import BondPortfolio
+from models.pricing_models.coupon_schedule import coupon_schedules
+
 class Bond:
     def __init__(self, cusip, issue_date, maturity_date, coupon, frequency, quantity, face_value=100):
         self.cusip = cusip
@@ -13,15 +17,9 @@ class Bond:
 
         # Determine periods per year
         self.freq_per_year = 2 if frequency == 'Semi-Annual' else 1
-        months = int(12 / self.freq_per_year)
 
-        # Build cashflow dates (vector of coupon dates)
-        dates = []
-        date = self.issue_date
-        while date < self.maturity_date:
-            date = date + pd.DateOffset(months=months)
-            dates.append(date)
-        self.dates = np.array(dates)
+        # Build cashflow dates (vector of coupon dates, memoized per issue/maturity/frequency)
+        _, self.dates = coupon_schedules(self.issue_date, self.maturity_date, self.freq_per_year)
 
         # Cashflow amounts (vector)
         coupon_amt = self.face_value * self.coupon_rate / 100 / self.freq_per_year
@@ -84,10 +82,34 @@ class Bond:
 
         return shock_mats
 
+    @staticmethod
+    def _as_portfolio(bonds):
+        """Accept either a BondPortfolio or a list of Bond instances."""
+        if isinstance(bonds, BondPortfolio):
+            return bonds
+        return BondPortfolio.from_bonds(bonds)
+
+    @staticmethod
+    def krd_bucket_weights(ttm_mat, key_tenors):
+        """
+        Sparse form of make_krd_shock_matrix: every TTM loads on at most two adjacent key
+        tenors, so only the lower key index and the two hat weights are returned.
+
+        Returns:
+          lo    (int index of the lower key tenor, same shape as ttm_mat),
+          w_lo  (weight on key lo),
+          w_hi  (weight on key lo + 1)
+        """
+        keys = np.asarray(key_tenors, dtype=float)
+        t = np.clip(np.nan_to_num(ttm_mat), keys[0], keys[-1])
+        lo = np.clip(np.searchsorted(keys, t, side='right') - 1, 0, len(keys) - 2)
+        w_hi = (t - keys[lo]) / (keys[lo + 1] - keys[lo])
+        return lo, 1.0 - w_hi, w_hi
+
     @classmethod
-    def price_batch_with_sensitivities(cls, bonds, as_of_date, yield_curve):
+    def price_batch_with_sensitivities(cls, bonds, as_of_date, yield_curve, method="bump", day_count="ACT/365.25"):
         """
-        Vectorized pricing for multiple Bond instances, computing:
+        Vectorized pricing for multiple Bond instances (or a BondPortfolio), computing:
 
           • Dirty price (PV of all future CFs under base curve)
           • Accrued interest (AI) at as_of_date
@@ -95,6 +117,11 @@ class Bond:
           • dv01        (parallel 1bp shift): PV_base − PV(curve+1bp)
           • krds        (per‐1bp key‐rate shocks at tenors [1,2,3,5,7,10,20,30])
 
+        method="bump" reprices under each shock; method="analytic" uses the closed-form
+        derivatives from price_batch_analytic (bump-and-reprice stays available to verify them).
+        day_count sets the discounting TTMs ("ACT/365.25" historical default, "ACT/365",
+        "ACT/ACT" ISDA; see utils.yearfrac). Accrued interest is always the actual-days ratio.
+
         Returns:
           pvs_base        (dirty prices),
           accrued_interest, 
@@ -102,61 +129,18 @@ class Bond:
           dv01            (1bp parallel),
           krd_matrix      (each column is key‐rate DV for 1bp)
         """
-        ao = pd.to_datetime(as_of_date)
-        n = len(bonds)
-        max_cf = max(len(b.dates) for b in bonds)
-
-        # Initialize mats
-        flows_mat = np.zeros((n, max_cf), dtype=float)
-        ttm_mat   = np.zeros((n, max_cf), dtype=float)
-
-        # To collect accrued interest
-        accrued_arr = np.zeros(n, dtype=float)
-
-        # Build flows_mat, ttm_mat, and compute accrued for each bond
-        for i, b in enumerate(bonds):
-            # Time to each coupon date, in years
-            raw_ttm = (b.dates.astype('datetime64[D]') - ao.to_datetime64()) \
-                      / np.timedelta64(1, 'D') / 365.25
-
-            # Zero out any cashflows at or before valuation date (we'll zero those flows, and mark TTM=NaN)
-            ttm = np.where(raw_ttm <= 0.0, np.nan, raw_ttm)
-
-            # Fill first k positions in the mats
-            k = len(b.dates)
-            flows_mat[i, :k] = b.flows
-            ttm_mat[i, :k]   = ttm
-
-            # If ttm was NaN (coupon date ≤ as_of_date), remove that flow
-            flows_mat[i, :k] = np.where(np.isnan(ttm), 0.0, b.flows)
-
-            # ===== Accrued Interest Calculation =====
-            # 1) coupon amount per period
-            coupon_amt = b.face_value * b.coupon_rate / 100 / b.freq_per_year
-
-            # 2) find next coupon date strictly > as_of_date
-            future_coupons = [d for d in b.dates if d > ao]
-            if len(future_coupons) == 0:
-                # Already matured or no future coupon → no accrual
-                accrued_arr[i] = 0.0
-            else:
-                next_coupon = future_coupons[0]
-                # find its index to get previous coupon
-                idx_next = list(b.dates).index(next_coupon)
+        if method == "analytic":
+            return cls.price_batch_analytic(bonds, as_of_date, yield_curve, day_count=day_count)[:5]
+        if method != "bump":
+            raise ValueError(f"Unknown sensitivity method '{method}' (expected 'bump' or 'analytic')")
 
-                if idx_next == 0:
-                    # first coupon is still in future → last coupon is issue_date
-                    prev_coupon = b.issue_date
-                else:
-                    prev_coupon = b.dates[idx_next - 1]
-
-                # accrual fraction between prev_coupon and next_coupon
-                accrual_days = (ao - prev_coupon).days
-                period_days  = (next_coupon - prev_coupon).days
-                accrual_frac = accrual_days / period_days if period_days > 0 else 0.0
+        ao = pd.to_datetime(as_of_date)
+        portfolio = cls._as_portfolio(bonds)
+        n = len(portfolio)
+        flows_mat, ttm_mat = portfolio.cashflow_layout(ao, day_count)
 
-                # accrued interest = coupon_amt × fraction
-                accrued_arr[i] = coupon_amt * accrual_frac
+        # Accrued interest per unit (coupon_amt × accrual fraction of the current period)
+        accrued_arr = portfolio.accrued_interest(ao)
 
         # Get the base yields (in percent) for each flow TTM
         rates_pct = yield_curve(ttm_mat)
@@ -187,7 +171,7 @@ class Bond:
             pvs_k = (flows_mat * dfs_k).sum(axis=1)
             krd_matrix[:, idx] = pvs_base - pvs_k
 
-        qtys = np.array([b.quantity for b in bonds])
+        qtys = portfolio.quantity
 
         pvs_base        *= qtys
         accrued_arr     *= qtys
@@ -196,3 +180,126 @@ class Bond:
         krd_matrix      *= qtys[:, None]  # broadcast to (n_bonds, n_keys)
         
         return pvs_base, accrued_arr, clean_prices, dv01, krd_matrix
+
+    @classmethod
+    def price_batch_analytic(cls, bonds, as_of_date, yield_curve, key_tenors=(1, 2, 3, 5, 7, 10, 20, 30),
+                             day_count="ACT/365.25"):
+        """
+        Single-pass pricing with closed-form sensitivities.
+
+        Under continuous compounding dPV/dr = −Σ flow × ttm × DF, so every sensitivity is a
+        reduction of the PV-weighted TTM grid (flow × DF × ttm):
+
+          • dv01       = Σ flow·DF·ttm × 1bp
+          • krds       = the same terms split across key tenors by krd_bucket_weights
+          • convexity  = Σ flow·DF·ttm² × 1bp², so ΔPV ≈ −dv01·Δbp + ½·convexity·Δbp²
+
+        day_count sets the TTM convention, as in price_batch_with_sensitivities.
+
+        Returns:
+          pvs_base, accrued_interest, clean_prices, dv01, krd_matrix (as price_batch_with_sensitivities),
+          convexity       (per 1bp², scaled by quantity)
+        """
+        ao = pd.to_datetime(as_of_date)
+        portfolio = cls._as_portfolio(bonds)
+        n = len(portfolio)
+        n_keys = len(key_tenors)
+        flows_mat, ttm_mat = portfolio.cashflow_layout(ao, day_count)
+        ttm = np.nan_to_num(ttm_mat)
+
+        accrued_arr = portfolio.accrued_interest(ao)
+
+        rates_pct = yield_curve(ttm_mat)
+        rates_pct = np.where(np.isnan(ttm_mat), 0.0, rates_pct)
+
+        # 1) PV of each cashflow, and its duration-weighted counterpart
+        cf_pv    = flows_mat * np.exp(-(rates_pct / 100) * ttm)
+        cf_pv_t  = cf_pv * ttm
+        pvs_base = cf_pv.sum(axis=1)
+        clean_prices = pvs_base - accrued_arr
+
+        # 2) dv01 and convexity (1bp = 1e-4 in decimal rate)
+        dv01      = cf_pv_t.sum(axis=1) * 1e-4
+        convexity = (cf_pv_t * ttm).sum(axis=1) * 1e-8
+
+        # 3) krds: scatter each cell's dv01 onto its two neighbouring key tenors
+        lo, w_lo, w_hi = cls.krd_bucket_weights(ttm_mat, list(key_tenors))
+        cell_dv01 = cf_pv_t * 1e-4
+        flat_idx = np.arange(n)[:, None] * n_keys + lo
+        krd_matrix = (
+            np.bincount(flat_idx.ravel(), weights=(cell_dv01 * w_lo).ravel(), minlength=n * n_keys)
+            + np.bincount((flat_idx + 1).ravel(), weights=(cell_dv01 * w_hi).ravel(), minlength=n * n_keys)
+        ).reshape(n, n_keys)
+
+        qtys = portfolio.quantity
+
+        pvs_base        *= qtys
+        accrued_arr     *= qtys
+        clean_prices    *= qtys
+        dv01            *= qtys
+        convexity       *= qtys
+        krd_matrix      *= qtys[:, None]
+
+        return pvs_base, accrued_arr, clean_prices, dv01, krd_matrix, convexity
+
+    @classmethod
+    def price_scenarios(cls, bonds, as_of_date, yield_curve, shifts=None, layout="dense", day_count="ACT/365.25"):
+        """
+        Price many curve scenarios off one shared cashflow layout.
+
+        layout="dense": the flows/TTM matrices are built once, every scenario's rates are stacked
+        into a (n_scenarios × n_bonds × max_cf) tensor and discounted in a single broadcasted exponent.
+
+        layout="dates": curve and discount factors are evaluated once per unique cashflow date
+        (n_scenarios × n_dates) and gathered into bond PVs with a sparse bond × date product.
+
+        Args:
+          yield_curve : a curve callable (tenor → rate %), or a sequence of them (one per scenario)
+          shifts      : optional additive rate shifts in percent, broadcast against the stacked rates:
+                          (n_scenarios,)                  → parallel shift per scenario
+                          (n_scenarios, n_bonds, max_cf)  → full shift tensor (layout="dense")
+                          (n_scenarios, n_dates)          → per-date shift (layout="dates")
+          day_count   : TTM convention, as in price_batch_with_sensitivities
+
+        Returns:
+          pv_matrix   (n_scenarios × n_bonds) dirty PVs, scaled by quantity
+        """
+        ao = pd.to_datetime(as_of_date)
+        portfolio = cls._as_portfolio(bonds)
+        curves = [yield_curve] if callable(yield_curve) else list(yield_curve)
+        if shifts is not None:
+            shifts = np.asarray(shifts, dtype=float)
+
+        if layout == "dates":
+            date_ttm, flows = portfolio.cashflow_date_matrix(ao, day_count)
+            grid = TenorGrid(date_ttm)
+            rates_pct = np.stack([evaluate_curve(c, grid) for c in curves])   # (n_curves, n_dates)
+            if shifts is not None:
+                rates_pct = rates_pct + (shifts[:, None] if shifts.ndim == 1 else shifts)
+
+            dfs = np.exp(-(rates_pct / 100) * date_ttm[None, :])
+            pv_matrix = np.asarray((flows @ dfs.T).T)
+            return pv_matrix * portfolio.quantity[None, :]
+
+        if layout != "dense":
+            raise ValueError(f"Unknown scenario layout '{layout}' (expected 'dense' or 'dates')")
+
+        flows_mat, ttm_mat = portfolio.cashflow_layout(ao, day_count)
+        ttm = np.nan_to_num(ttm_mat)
+
+        # one TenorGrid: Curves sharing knots (a base curve and its shocks) locate it only once
+        grid = TenorGrid(ttm_mat)
+        rates_pct = np.stack([evaluate_curve(c, grid) for c in curves])       # (n_curves, n, max_cf)
+
+        if shifts is not None:
+            if shifts.ndim == 1:
+                shifts = shifts[:, None, None]
+            rates_pct = rates_pct + shifts
+
+        # For any NaN-ttm, force rate = 0 so DF = 1 (its flow is already zero)
+        rates_pct = np.where(np.isnan(ttm_mat)[None, :, :], 0.0, rates_pct)
+
+        dfs = np.exp(-(rates_pct / 100) * ttm[None, :, :])
+        pv_matrix = np.einsum('sij,ij->si', dfs, flows_mat)
+
+        return pv_matrix * portfolio.quantity[None, :]
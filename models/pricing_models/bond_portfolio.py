@@ -0,0 +1,194 @@
+import pandas as pd
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from models.pricing_models.coupon_schedule import coupon_schedules
+from utils.yearfrac import year_fraction
+
+
+class BondPortfolio:
+    """
+    Columnar (struct-of-arrays) view of a bond inventory.
+
+    Every per-bond attribute is a contiguous array of length n_bonds, and the cashflows of all
+    bonds live in one CSR-style table:
+
+      cf_offsets  (n_bonds + 1,)  bond i owns rows cf_offsets[i]:cf_offsets[i+1]
+      cf_dates    (n_cf,)         datetime64[D] cashflow dates, ascending within each bond
+      cf_amounts  (n_cf,)         coupon (+ redemption on the last row) per cashflow
+    """
+
+    def __init__(self, cusip, issue_date, maturity_date, coupon, freq_per_year, quantity,
+                 face_value=100.0, cf_offsets=None, cf_dates=None, cf_amounts=None):
+        self.cusip         = np.asarray(cusip, dtype=object)
+        self.issue_date    = np.asarray(issue_date, dtype='datetime64[D]')
+        self.maturity_date = np.asarray(maturity_date, dtype='datetime64[D]')
+        self.coupon_rate   = np.nan_to_num(np.asarray(coupon, dtype=float))
+        self.freq_per_year = np.asarray(freq_per_year, dtype=np.int64)
+        self.quantity      = np.asarray(quantity, dtype=float)
+        self.face_value    = np.broadcast_to(np.asarray(face_value, dtype=float), self.quantity.shape).copy()
+
+        if cf_offsets is None:
+            cf_offsets, cf_dates, cf_amounts = self._build_cashflows()
+        self.cf_offsets = np.asarray(cf_offsets, dtype=np.int64)
+        self.cf_dates   = np.asarray(cf_dates, dtype='datetime64[D]')
+        self.cf_amounts = np.asarray(cf_amounts, dtype=float)
+
+    def __len__(self):
+        return len(self.quantity)
+
+    def _as_of_days(self, as_of_date):
+        """Valuation date(s) as datetime64[D]: a scalar, or one date per bond for multi-date blocks."""
+        ao = pd.to_datetime(as_of_date)
+        if np.ndim(ao) == 0:
+            return np.datetime64(ao.date(), 'D')
+        ao = np.asarray(ao, dtype='datetime64[D]')
+        if ao.shape != (len(self),):
+            raise ValueError(f"Expected one as_of_date per bond ({len(self)}), got shape {ao.shape}")
+        return ao
+
+    @property
+    def cf_counts(self):
+        return np.diff(self.cf_offsets)
+
+    @property
+    def coupon_amount(self):
+        """Coupon paid per period for each bond."""
+        return self.face_value * self.coupon_rate / 100 / self.freq_per_year
+
+    @classmethod
+    def from_inventory(cls, inv: pd.DataFrame, face_value=100.0):
+        """
+        Build straight from a tsy_inventory query result
+        (cusip, int_rate, issue_date, maturity_date, quantity, int_payment_frequency).
+        """
+        freq = np.where(inv["int_payment_frequency"].to_numpy() == 'Semi-Annual', 2, 1)
+        return cls(
+            cusip         = inv["cusip"].to_numpy(),
+            issue_date    = pd.to_datetime(inv["issue_date"]).to_numpy(),
+            maturity_date = pd.to_datetime(inv["maturity_date"]).to_numpy(),
+            coupon        = pd.to_numeric(inv["int_rate"]).to_numpy(dtype=float, na_value=np.nan),
+            freq_per_year = freq,
+            quantity      = inv["quantity"].to_numpy(dtype=float),
+            face_value    = face_value,
+        )
+
+    @classmethod
+    def from_bonds(cls, bonds):
+        """Pack a list of Bond instances, reusing their already-built cashflows."""
+        counts = np.array([len(b.dates) for b in bonds], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        return cls(
+            cusip         = [b.cusip for b in bonds],
+            issue_date    = [b.issue_date.to_datetime64() for b in bonds],
+            maturity_date = [b.maturity_date.to_datetime64() for b in bonds],
+            coupon        = [b.coupon_rate for b in bonds],
+            freq_per_year = [b.freq_per_year for b in bonds],
+            quantity      = [b.quantity for b in bonds],
+            face_value    = [b.face_value for b in bonds],
+            cf_offsets    = offsets,
+            cf_dates      = np.concatenate([b.dates.astype('datetime64[D]') for b in bonds]),
+            cf_amounts    = np.concatenate([b.flows for b in bonds]),
+        )
+
+    def _build_cashflows(self):
+        """Generate the CSR cashflow table from the (memoized) vectorized coupon schedules."""
+        offsets, cf_dates = coupon_schedules(self.issue_date, self.maturity_date, self.freq_per_year)
+        counts = np.diff(offsets)
+
+        # coupon on every row, redemption added on each bond's last row
+        cf_amounts = np.repeat(self.coupon_amount, counts)
+        has_cf = counts > 0
+        cf_amounts[offsets[1:][has_cf] - 1] += self.face_value[has_cf]
+        return offsets, cf_dates, cf_amounts
+
+    def cashflow_layout(self, as_of_date, day_count="ACT/365.25"):
+        """
+        Scatter the CSR table into padded (n_bonds × max_cf) matrices.
+        as_of_date may be a single date or one date per bond (multi-date valuation blocks);
+        TTMs are year fractions under day_count (see utils.yearfrac.year_fraction).
+
+        Returns:
+          flows_mat  (cashflow amounts, zeroed at or before as_of_date),
+          ttm_mat    (years to each cashflow; NaN at or before as_of_date, 0 in padding)
+        """
+        ao = self._as_of_days(as_of_date)
+        counts = self.cf_counts
+        n = len(self)
+        max_cf = int(counts.max()) if n else 0
+
+        rows = np.repeat(np.arange(n), counts)
+        cols = np.arange(len(self.cf_dates)) - np.repeat(self.cf_offsets[:-1], counts)
+
+        cf_ao = ao if np.ndim(ao) == 0 else ao[rows]
+        raw_ttm = year_fraction(cf_ao, self.cf_dates, day_count)
+        alive = raw_ttm > 0.0
+
+        flows_mat = np.zeros((n, max_cf), dtype=float)
+        ttm_mat   = np.zeros((n, max_cf), dtype=float)
+        ttm_mat[rows, cols]   = np.where(alive, raw_ttm, np.nan)
+        flows_mat[rows, cols] = np.where(alive, self.cf_amounts, 0.0)
+        return flows_mat, ttm_mat
+
+    def cashflow_date_matrix(self, as_of_date, day_count="ACT/365.25"):
+        """
+        Sparse bond × date view of the live cashflows.
+
+        Treasury coupons cluster on a few calendar dates, so discounting once per unique date
+        and gathering with a sparse product replaces the per-(bond, cashflow) evaluation.
+
+        Returns:
+          date_ttm   (n_dates,) years from as_of_date to each unique future cashflow date,
+          flows      (n_bonds × n_dates) csr_matrix of cashflow amounts
+        """
+        ao = self._as_of_days(as_of_date)
+        if np.ndim(ao) != 0:
+            raise ValueError("cashflow_date_matrix needs a single as_of_date")
+        rows = np.repeat(np.arange(len(self)), self.cf_counts)
+        alive = self.cf_dates > ao
+
+        u_dates, cols = np.unique(self.cf_dates[alive], return_inverse=True)
+        flows = csr_matrix((self.cf_amounts[alive], (rows[alive], cols.reshape(-1))),
+                           shape=(len(self), len(u_dates)))
+        date_ttm = year_fraction(ao, u_dates, day_count)
+        return date_ttm, flows
+
+    def accrued_interest(self, as_of_date):
+        """
+        Per-bond accrued interest (per unit, before quantity) at as_of_date
+        (a single date or one date per bond): coupon × actual days elapsed / actual days in
+        the period, the Treasury (ICMA) accrual whatever day count discounts the cashflows.
+
+        Fully array-based: a single searchsorted over the flattened schedule, keyed by
+        (bond row, date) so it stays sorted across bonds, finds each bond's next coupon
+        strictly after as_of_date; the previous coupon (or issue date) is the row before it.
+        """
+        ao = self._as_of_days(as_of_date)
+        n = len(self)
+        counts = self.cf_counts
+        starts = self.cf_offsets[:-1]
+        if len(self.cf_dates) == 0:
+            return np.zeros(n, dtype=float)
+
+        # 1) composite sort key: bond row in the high bits, day number in the low bits
+        rows = np.repeat(np.arange(n, dtype=np.int64), counts)
+        day_span = np.int64(1) << 32
+        key = rows * day_span + self.cf_dates.astype(np.int64)
+        probe = np.arange(n, dtype=np.int64) * day_span + ao.astype(np.int64)
+        idx_next = np.searchsorted(key, probe, side='right')
+
+        # 2) bonds with no coupon after as_of_date (matured / empty schedule) accrue nothing
+        has_next = idx_next < starts + counts
+        next_coupon = self.cf_dates[np.minimum(idx_next, len(self.cf_dates) - 1)]
+
+        # 3) first coupon still in future → last coupon is issue_date
+        prev_coupon = np.where(idx_next == starts, self.issue_date,
+                               self.cf_dates[np.maximum(idx_next - 1, 0)])
+
+        # 4) accrual fraction = actual days elapsed / actual days in the period
+        accrued_days = (ao - prev_coupon).astype(float)
+        period_days  = (next_coupon - prev_coupon).astype(float)
+        accrual_frac = np.divide(accrued_days, period_days,
+                                 out=np.zeros(n, dtype=float), where=has_next & (period_days > 0))
+
+        return self.coupon_amount * accrual_frac
@@ -0,0 +1,91 @@
+import numpy as np
+
+# (issue_date, maturity_date, freq_per_year) → datetime64[D] coupon dates.
+# The same CUSIPs reappear on every inventory date, so schedules are built once per process.
+_SCHEDULE_CACHE: dict[tuple[np.datetime64, np.datetime64, int], np.ndarray] = {}
+
+
+def clear_schedule_cache():
+    _SCHEDULE_CACHE.clear()
+
+
+def _generate(issue_date, maturity_date, freq_per_year):
+    """
+    Vectorized schedule generation for arrays of (issue, maturity, frequency).
+
+    Coupon k falls k × (12 / freq) months after issue, anchored on the issue date:
+      • issue on the last day of its month → every coupon on the last day of its month
+      • otherwise the issue day-of-month, clipped to the length of the target month
+    Coupons are generated until the first one on or after maturity (inclusive), matching
+    the "step while date < maturity" rule used by Bond.
+
+    Returns a list of datetime64[D] arrays, one per input row.
+    """
+    issue = np.asarray(issue_date, dtype='datetime64[D]')
+    maturity = np.asarray(maturity_date, dtype='datetime64[D]')
+    step = (12 // np.asarray(freq_per_year, dtype=np.int64))
+
+    issue_m = issue.astype('datetime64[M]')
+    issue_day = (issue - issue_m.astype('datetime64[D]')).astype(np.int64) + 1
+    issue_eom = (issue + 1).astype('datetime64[M]') != issue_m
+
+    # enough periods to reach maturity (+1 for the first date at/after maturity)
+    span_m = (maturity.astype('datetime64[M]') - issue_m).astype(np.int64)
+    n_max = int(np.max(np.maximum(span_m, 0) // step + 2, initial=1))
+    k = np.arange(1, n_max + 1)
+
+    months = issue_m[:, None] + (k[None, :] * step[:, None]).astype('timedelta64[M]')
+    month_start = months.astype('datetime64[D]')
+    month_len = ((months + 1).astype('datetime64[D]') - month_start).astype(np.int64)
+    day = np.where(issue_eom[:, None], month_len, np.minimum(issue_day[:, None], month_len))
+    grid = month_start + (day - 1).astype('timedelta64[D]')
+
+    # date k is kept while the previous date (issue for k=1) is still before maturity
+    prev = np.concatenate([issue[:, None], grid[:, :-1]], axis=1)
+    keep = prev < maturity[:, None]
+    counts = keep.sum(axis=1)
+
+    return [grid[i, :counts[i]] for i in range(len(issue))]
+
+
+def coupon_schedules(issue_date, maturity_date, freq_per_year):
+    """
+    Coupon dates for a whole inventory at once, as a CSR pair.
+
+    Args:
+      issue_date, maturity_date : array-likes convertible to datetime64[D]
+      freq_per_year             : coupons per year (1 or 2, …) per bond
+
+    Returns:
+      offsets (n_bonds + 1,)  bond i owns dates[offsets[i]:offsets[i+1]]
+      dates   (n_cf,)         datetime64[D] coupon dates
+    """
+    issue = np.atleast_1d(np.asarray(issue_date, dtype='datetime64[D]'))
+    maturity = np.atleast_1d(np.asarray(maturity_date, dtype='datetime64[D]'))
+    freq = np.broadcast_to(np.asarray(freq_per_year, dtype=np.int64), issue.shape)
+
+    # 1) dedupe the (issue, maturity, freq) keys within this call
+    keys = np.stack([issue.astype(np.int64), maturity.astype(np.int64), freq], axis=1)
+    uniq, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    u_keys = [(np.datetime64(int(i), 'D'), np.datetime64(int(m), 'D'), int(f)) for i, m, f in uniq]
+
+    # 2) generate every schedule not yet memoized in one vectorized pass
+    missing = [j for j, key in enumerate(u_keys) if key not in _SCHEDULE_CACHE]
+    if missing:
+        built = _generate(uniq[missing, 0].astype('datetime64[D]'),
+                          uniq[missing, 1].astype('datetime64[D]'),
+                          uniq[missing, 2])
+        for j, dates in zip(missing, built):
+            _SCHEDULE_CACHE[u_keys[j]] = dates
+
+    # 3) gather unique schedules back out to one CSR row per bond
+    u_dates = [_SCHEDULE_CACHE[key] for key in u_keys]
+    u_counts = np.array([len(d) for d in u_dates], dtype=np.int64)
+    u_offsets = np.concatenate([[0], np.cumsum(u_counts)])
+    u_flat = np.concatenate(u_dates) if u_dates else np.array([], dtype='datetime64[D]')
+
+    counts = u_counts[inverse]
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    src = np.repeat(u_offsets[:-1][inverse], counts) + (np.arange(offsets[-1]) - np.repeat(offsets[:-1], counts))
+    return offsets, u_flat[src]
@@ -0,0 +1,183 @@
+import json
+
+import pandas as pd
+import numpy as np
+
+from data import mirror
+from data.query import run_query
+from data.treasury_curve import get_yield_curves, shocks
+from models.pca_model import make_pca_bumped_curve
+from models.pricing_models.bond_model import Bond
+from models.pricing_models.bond_portfolio import BondPortfolio
+
+CURVE_TYPE = 'US Treasury Par'
+PCA_TENORS = np.array([0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 7.0, 10.0, 20.0, 30.0])
+KEY_COLS = ['krd1y', 'krd2y', 'krd3y', 'krd5y', 'krd7y', 'krd10y', 'krd20y', 'krd30y']
+
+# column label → (principal component index, shift in bp)
+PCA_SHOCKS = {
+    f'price_closedform_pca{pc + 1}_{side}{bp}bps': (pc, sign * bp)
+    for bp in (25, 100, 200)
+    for pc in range(3)
+    for side, sign in (('u', +1), ('d', -1))
+}
+
+
+def parse_pg_array(val):
+    if isinstance(val, str) or isinstance(val, bytes):
+        # Decode bytes if needed
+        if isinstance(val, bytes):
+            val = val.decode('utf-8')
+        # Convert Postgres array string to Python list
+        val = val.strip('{}')
+        return np.array([float(x) for x in val.split(',')], dtype=float)
+    return np.array(val, dtype=float)
+
+
+def load_valuation_inputs(start_date, end_date, data_source):
+    """
+    Bulk-load everything a date range of valuations needs, in three reads (curves and PCA
+    results from the local Parquet mirror):
+
+      inv     : one row per (inventory_date, cusip)
+      curves  : {curve_date: base yield curve}
+      pca     : {curve_date: (components (n_pcs × n_tenors), explained_variance_ratios)}
+    """
+    inv_sql = """
+    SELECT DISTINCT ON(inventory_date, cusip)
+        inventory_date,
+        cusip,
+        int_rate,
+        issue_date,
+        maturity_date,
+        price_per100,
+        quantity,
+        int_payment_frequency
+    FROM tsy_inventory
+    WHERE inventory_date BETWEEN :start_date AND :end_date
+    ORDER BY inventory_date, cusip;
+    """
+    dates = {"start_date": start_date, "end_date": end_date}
+    inv = run_query(data_source, inv_sql, dates).to_pandas()
+    if not inv.empty:
+        inv['inventory_date'] = pd.to_datetime(inv['inventory_date']).dt.date
+
+    curves = get_yield_curves(start_date, end_date, data_source)
+
+    pca_df = mirror.load(data_source, "pca_results", start_date, end_date,
+                         columns=["curve_date", "components", "explained_variance_ratios", "n_components"],
+                         where={"curve_type": CURVE_TYPE}).to_pandas()
+    pca_df = pca_df[pca_df["n_components"] >= 3]
+    pca = {
+        pd.to_datetime(r.curve_date).date(): (
+            # JSONB is mirrored as JSON text (already decoded when queried through psycopg)
+            np.array(json.loads(r.components) if isinstance(r.components, (str, bytes)) else r.components,
+                     dtype=float),
+            parse_pg_array(r.explained_variance_ratios),
+        )
+        for r in pca_df.itertuples()
+    }
+    return inv, curves, pca
+
+
+def _rowwise_curve(curves, group_rows):
+    """Curve callable that evaluates curves[g] on the rows of date group g only."""
+    def f(ttm_arr):
+        out = np.empty_like(ttm_arr, dtype=float)
+        for c, rows in zip(curves, group_rows):
+            out[rows] = c(ttm_arr[rows])
+        return out
+    return f
+
+
+def _value_block(inv, dates, curves, pca):
+    """Price one block of dates: every (date, bond) row of inv in a single portfolio."""
+    date_pos = {d: g for g, d in enumerate(dates)}
+    group = inv['inventory_date'].map(date_pos).to_numpy()
+    group_rows = [np.flatnonzero(group == g) for g in range(len(dates))]
+    asof = np.asarray(pd.to_datetime(inv['inventory_date']), dtype='datetime64[D]')
+
+    portfolio = BondPortfolio.from_inventory(inv)
+    base_curves = [curves[d] for d in dates]
+    base_yc = _rowwise_curve(base_curves, group_rows)
+
+    # 1) base price + closed-form sensitivities for the whole block
+    pvs_dirty, accrued_arr, pvs_clean, dv01s, krds_mat = Bond.price_batch_with_sensitivities(
+        portfolio, asof, base_yc, method="analytic")
+
+    results = inv.copy().reset_index(drop=True)
+    results['price_closedform']            = pvs_dirty
+    results['clean_price_closedform']      = pvs_clean
+    results['accrued_interest_closedform'] = accrued_arr
+    results['dv01']                        = dv01s
+    for i, col in enumerate(KEY_COLS):
+        results[col] = krds_mat[:, i]
+
+    # 2) PCA shocks: one row-wise curve per scenario, each built from its own date's components
+    pca_curves = [
+        _rowwise_curve([make_pca_bumped_curve(base_curves[g], PCA_TENORS, pca[d][0][pc], bp)
+                        for g, d in enumerate(dates)], group_rows)
+        for pc, bp in PCA_SHOCKS.values()
+    ]
+    pca_pvs = Bond.price_scenarios(portfolio, asof, pca_curves)
+    for col_label, pvs_bump in zip(PCA_SHOCKS, pca_pvs):
+        results[col_label] = pvs_bump
+
+    # 3) PCA DV01s scale the parallel dv01 by each date's explained variance
+    evr = np.stack([pca[d][1][:3] for d in dates])[group]
+    for k in range(3):
+        results[f'pca{k + 1}_dv01'] = evr[:, k] * results['dv01']
+
+    # 4) Parallel shocks (shifts are in percent)
+    shift_pct = np.array(list(shocks.values()), dtype=float) / 100.0
+    par_pvs = Bond.price_scenarios(portfolio, asof, base_yc, shifts=shift_pct)
+    for lab, pvs_b in zip(shocks, par_pvs):
+        results[f'price_closedform_{lab}bps'] = pvs_b
+
+    return results
+
+
+def value_date_range(inv, curves, pca, dates_per_block=20):
+    """
+    Multi-date valuation kernel for backfills.
+
+    Prices every (inventory_date, bond) row of a bulk-loaded inventory in blocks of
+    dates_per_block dates, producing the same columns run_valuation writes to tsy_valuations.
+
+    Returns:
+      results (DataFrame, one row per live (valuation_date, cusip)),
+      errors  (list of (date, message) for dates that could not be valued)
+    """
+    errors = []
+    if inv.empty:
+        return inv.copy(), errors
+
+    priced_dates = []
+    for d in sorted(inv['inventory_date'].unique()):
+        if d not in curves:
+            errors.append((d, f"No yield curve data found for {d}"))
+        elif d not in pca:
+            errors.append((d, f"No PCA results for {d}"))
+        elif pca[d][0].shape[1] != PCA_TENORS.shape[0]:
+            errors.append((d, "Mismatch PCA length vs tenor grid."))
+        else:
+            priced_dates.append(d)
+
+    blocks = []
+    for start in range(0, len(priced_dates), dates_per_block):
+        dates = priced_dates[start:start + dates_per_block]
+        block_inv = inv[inv['inventory_date'].isin(dates)]
+        blocks.append(_value_block(block_inv, dates, curves, pca))
+
+    if not blocks:
+        return inv.iloc[0:0].copy(), errors
+    results = pd.concat(blocks, ignore_index=True)
+
+    # Housekeeping + drop near‐maturity
+    results['valuation_date'] = results['inventory_date']
+    results['time_to_maturity'] = (
+        pd.to_datetime(results['maturity_date']) - pd.to_datetime(results['valuation_date'])
+    ).dt.days / 365.25
+    results['coupon'] = results['int_rate'].fillna(0.0)
+    alive = results['time_to_maturity'] > 1e-4
+    return results[alive].reset_index(drop=True), errors
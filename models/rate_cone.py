@@ -0,0 +1,124 @@
+import numpy as np
+from scipy.stats import norm, qmc
+
+PERCENTILES = (1, 5, 10, 50, 90, 95, 99)
+SAMPLING_METHODS = ("pseudo", "antithetic", "sobol")
+
+
+def is_gaussian(cov_model) -> bool:
+    """True if the model's daily deltas are N(0, covariance_), so its cone has a closed form."""
+    return bool(getattr(cov_model, "gaussian", False))
+
+
+def analytic_cone(base_rates, cov, days_forward, percentiles=PERCENTILES) -> np.ndarray:
+    """
+    Closed-form cone of a Gaussian model: base + z_p · sqrt(diag(cov) · days_forward).
+
+    Each tenor's rate after days_forward i.i.d. N(0, cov) daily deltas is normal with variance
+    diag(cov)·days, so its percentiles need no sampling.
+
+    Returns:
+      (n_percentiles × n_tenors) rates, one row per percentile in the order given
+    """
+    z = norm.ppf(np.asarray(percentiles, dtype=float) / 100)
+    sigma = np.sqrt(np.diag(np.asarray(cov, dtype=float)) * days_forward)
+    return np.asarray(base_rates, dtype=float)[None, :] + z[:, None] * sigma[None, :]
+
+
+def cholesky_factor(cov) -> np.ndarray:
+    """
+    Lower factor L with L·Lᵀ = cov, so deltas = Z·Lᵀ for standard-normal rows Z.
+
+    Sample covariances of short windows can be singular; those fall back to the PSD square
+    root V·sqrt(max(w, 0)) from an eigendecomposition (what multivariate_normal does via SVD).
+    """
+    cov = np.asarray(cov, dtype=float)
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        w, V = np.linalg.eigh(cov)
+        return V * np.sqrt(np.clip(w, 0.0, None))
+
+
+class SimulationContext:
+    """
+    Standard-normal draws for a cone job: one (n_sims × n_tenors) block per as-of date, from a
+    Generator seeded by that date's child of SeedSequence(seed).
+
+      • every horizon and model of a date scales the same block by its own factor and sqrt(days)
+        — draws are made once per date, and model-to-model differences are common-random-number
+      • children are spawned up front in date order, so a date's draws don't depend on which
+        worker thread runs it or when: parallel runs are reproducible for a given seed
+      • nothing touches the global np.random state
+
+    sampling:
+      "pseudo"      i.i.d. normals
+      "antithetic"  each normal row z is paired with −z (odd moments, and the median, exact)
+      "sobol"       scrambled Sobol points mapped through the normal inverse CDF (keep
+                    n_sims / n_replicates a power of two for the Sobol balance properties)
+
+    The block is n_replicates independent sub-blocks of n_sims / n_replicates rows (own
+    scramble / own antithetic pairs), so quantile_standard_errors() can measure the sampling
+    error of any of the methods from the spread between replicates.
+    """
+
+    def __init__(self, dates, n_sims, seed=None, sampling="pseudo", n_replicates=8):
+        if sampling not in SAMPLING_METHODS:
+            raise ValueError(f"Unknown sampling '{sampling}' (expected one of {SAMPLING_METHODS})")
+        if n_sims % n_replicates:
+            raise ValueError(f"n_sims={n_sims} is not a multiple of n_replicates={n_replicates}")
+        self.n_sims = n_sims
+        self.sampling = sampling
+        self.n_replicates = n_replicates
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self._children = dict(zip(dates, self.seed_sequence.spawn(len(dates))))
+
+    @property
+    def seed(self):
+        """Entropy of the root SeedSequence (log it to reproduce an unseeded run)."""
+        return self.seed_sequence.entropy
+
+    def generator(self, d) -> np.random.Generator:
+        """A fresh Generator for date d (the same stream every time it is asked for)."""
+        return np.random.default_rng(self._children[d])
+
+    def normals(self, d, n_tenors) -> np.ndarray:
+        """The (n_sims × n_tenors) standard-normal block of date d, replicate-major."""
+        rng = self.generator(d)
+        m = self.n_sims // self.n_replicates
+        return np.concatenate([self._replicate(rng, m, n_tenors) for _ in range(self.n_replicates)])
+
+    def _replicate(self, rng, m, n_tenors):
+        if self.sampling == "sobol":
+            u = qmc.Sobol(d=n_tenors, scramble=True, seed=rng).random(m)
+            return norm.ppf(np.clip(u, 1e-12, 1 - 1e-12))
+        if self.sampling == "antithetic":
+            z = rng.standard_normal(((m + 1) // 2, n_tenors))
+            return np.concatenate([z, -z])[:m]
+        return rng.standard_normal((m, n_tenors))
+
+
+def simulate_cone(base_rates, chol, days_forward, normals) -> np.ndarray:
+    """
+    (n_sims × n_tenors) simulated rates after days_forward i.i.d. N(0, L·Lᵀ) daily deltas:
+    base + sqrt(days) · Z·Lᵀ for the standard-normal block Z (see SimulationContext.normals).
+    Factor chol once per model and reuse it for every horizon.
+    """
+    return np.asarray(base_rates, dtype=float)[None, :] + np.sqrt(days_forward) * (normals @ chol.T)
+
+
+def cone_quantiles(sims, percentiles=PERCENTILES) -> np.ndarray:
+    """(n_percentiles × n_tenors) percentiles of simulated rates, in one pass over the sims axis."""
+    return np.quantile(sims, np.asarray(percentiles, dtype=float) / 100, axis=0)
+
+
+def quantile_standard_errors(sims, n_replicates, percentiles=PERCENTILES) -> np.ndarray:
+    """
+    (n_percentiles × n_tenors) standard errors of cone_quantiles(sims), from the spread of the
+    same percentiles over the n_replicates independent sub-blocks (see SimulationContext):
+    std(q_r, ddof=1) / sqrt(n_replicates). Valid for pseudo, antithetic and Sobol draws alike;
+    at the 1%/99% tails of small replicates it reads somewhat low (their own quantiles are noisy).
+    """
+    reps = np.asarray(sims).reshape(n_replicates, -1, np.shape(sims)[-1])
+    q = np.quantile(reps, np.asarray(percentiles, dtype=float) / 100, axis=1)    # (p, r, tenors)
+    return q.std(axis=1, ddof=1) / np.sqrt(n_replicates)
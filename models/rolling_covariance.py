@@ -0,0 +1,111 @@
+import numpy as np
+
+from models.empirical_covariance import EmpiricalCovarianceModel
+
+
+def _prefix_moments(Z):
+    """(n+1, f) prefix sums of the rows of Z and (n+1, f, f) prefix sums of their outer products."""
+    zeros = np.zeros((1,) + Z.shape[1:])
+    csum = np.concatenate([zeros, np.cumsum(Z, axis=0)])
+    cprod = np.concatenate([zeros[..., None] * zeros[:, None, :],
+                            np.cumsum(Z[:, :, None] * Z[:, None, :], axis=0)])
+    return csum, cprod
+
+
+def _window_cov(csum, cprod, lo, hi, ddof):
+    """Covariances/means of the half-open row windows [lo, hi) from prefix moments (broadcasts)."""
+    n = (hi - lo)[..., None].astype(float)
+    m = (csum[hi] - csum[lo]) / n
+    xprod = cprod[hi] - cprod[lo]
+    cov = (xprod - n[..., None] * m[..., :, None] * m[..., None, :]) / (n[..., None] - ddof)
+    return cov, m
+
+
+def window_covariances(X_np: np.ndarray, starts, ends, ddof: int = 1):
+    """
+    Covariances and means of many row windows X_np[start:end] at once, from prefix sums of the
+    rows and of their outer products (no per-window loop).
+
+    Returns:
+      cov    : (n_windows, n_features, n_features)
+      mean   : (n_windows, n_features)
+      n_obs  : (n_windows,)
+    """
+    X = np.asarray(X_np, dtype=float)
+    starts, ends = np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64)
+    shift = X.mean(axis=0)
+    csum, cprod = _prefix_moments(X - shift)
+    cov, m = _window_cov(csum, cprod, starts, ends, ddof)
+    return cov, shift + m, ends - starts
+
+
+class RollingCovariance:
+    """
+    Windowed covariance of any row range of a fixed observation matrix (e.g. daily rate deltas)
+    in O(n_features²), from prefix sums built once in O(n_obs · n_features²).
+
+      X       (n_obs × n_features)  observations in time order; NaN where a series is missing
+      index   (n_obs,)              optional ascending datetime64[D] label of each row
+
+    Missing values are treated like dropna() on the window: a window restricted to some columns
+    starts after the last row in which any of those columns is NaN.
+    ddof=0 matches sklearn's EmpiricalCovariance (and EmpiricalCovarianceModel).
+    """
+
+    def __init__(self, X, index=None, ddof=0):
+        X = np.asarray(X, dtype=float)
+        self.n_obs, self.n_features = X.shape
+        self.index = None if index is None else np.asarray(index, dtype='datetime64[D]')
+        self.ddof = ddof
+
+        missing = np.isnan(X)
+        # column means (0 for an all-NaN column), subtracted for conditioning
+        self._shift = np.where(missing, 0.0, X).sum(axis=0) / np.maximum((~missing).sum(axis=0), 1)
+        self._csum, self._cprod = _prefix_moments(np.where(missing, 0.0, X - self._shift))
+        # last_nan[i, c] = last row < i where column c is NaN (−1 if none)
+        rows = np.where(missing, np.arange(self.n_obs)[:, None], -1)
+        self._last_nan = np.concatenate([np.full((1, self.n_features), -1),
+                                         np.maximum.accumulate(rows, axis=0)])
+
+    def rows(self, start_date, end_date):
+        """Half-open row range [lo, hi) of the rows labelled start_date … end_date (inclusive)."""
+        lo = np.searchsorted(self.index, np.datetime64(start_date, 'D'), side='left')
+        hi = np.searchsorted(self.index, np.datetime64(end_date, 'D'), side='right')
+        return int(lo), int(hi)
+
+    def window(self, lo, hi, columns=None):
+        """
+        Covariance of rows [lo, hi) over columns (default all).
+
+        Returns:
+          cov     (k × k), mean (k,), n_obs in the window, and the effective first row
+          (after skipping rows with NaN in the selected columns)
+        """
+        cols = np.arange(self.n_features) if columns is None else np.asarray(columns)
+        lo = max(lo, int(self._last_nan[hi, cols].max()) + 1)
+        if hi - lo <= self.ddof:
+            raise ValueError(f"Window [{lo}, {hi}) has too few complete rows for a covariance")
+        ix = np.ix_(cols, cols)
+        n = hi - lo
+        m = (self._csum[hi, cols] - self._csum[lo, cols]) / n
+        cov = ((self._cprod[hi][ix] - self._cprod[lo][ix]) - n * np.outer(m, m)) / (n - self.ddof)
+        return cov, self._shift[cols] + m, n, lo
+
+    def covariance(self, start_date, end_date, columns=None):
+        """Covariance of the rows labelled start_date … end_date (inclusive)."""
+        return self.window(*self.rows(start_date, end_date), columns=columns)[0]
+
+    def covariances(self, starts, ends):
+        """
+        (n_windows × f × f) covariances of row windows [starts, ends) over all columns, vectorized.
+        Each window starts after its last row with a NaN in any column, as in window().
+        """
+        starts, ends = np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64)
+        starts = np.maximum(starts, self._last_nan[ends].max(axis=-1) + 1)
+        if np.any(ends - starts <= self.ddof):
+            raise ValueError("Some windows have too few complete rows for a covariance")
+        return _window_cov(self._csum, self._cprod, starts, ends, self.ddof)[0]
+
+    def model(self, lo, hi, columns=None):
+        """EmpiricalCovarianceModel fitted on rows [lo, hi) — without touching the data again."""
+        return EmpiricalCovarianceModel.from_covariance(self.window(lo, hi, columns)[0])
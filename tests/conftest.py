@@ -0,0 +1,20 @@
+import sys
+import types
+from pathlib import Path
+
+# the repo root, as the notebooks and apps add it, so `models.…` / `data.…` import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    import domino.data_sources  # noqa: F401
+except ImportError:
+    # outside Domino: data.data_source only needs the SDK's client class to import, and the
+    # tests hand their own data sources to the code under test
+    class DataSourceClient:
+        def get_datasource(self, name):
+            raise RuntimeError(f"Data source '{name}' is only available inside Domino")
+
+    domino = types.ModuleType("domino")
+    domino.data_sources = types.ModuleType("domino.data_sources")
+    domino.data_sources.DataSourceClient = DataSourceClient
+    sys.modules.update({"domino": domino, "domino.data_sources": domino.data_sources})
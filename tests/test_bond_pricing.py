@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.interpolate import interp1d
+
+from models.pricing_models.bond_model import Bond
+from models.pricing_models.bond_portfolio import BondPortfolio
+from models.pricing_models.coupon_schedule import clear_schedule_cache, coupon_schedules
+from utils.yearfrac import year_fraction_act_act
+
+AS_OF = pd.Timestamp("2024-03-15")
+TENORS = np.array([1 / 12, 2 / 12, 0.25, 0.5, 1, 2, 3, 5, 7, 10, 20, 30])
+RATES = 4 + 0.3 * np.log1p(TENORS)
+
+
+@pytest.fixture(scope="module")
+def inventory():
+    """tsy_inventory-shaped rows: bills, notes and bonds, some month-end issues, a missing coupon."""
+    rng = np.random.default_rng(0)
+    rows = []
+    for i in range(200):
+        term = int(rng.choice([1, 2, 3, 5, 7, 10, 20, 30]))
+        issue = AS_OF - pd.Timedelta(days=int(rng.integers(0, 365 * term)))
+        if i % 3 == 0:
+            issue = issue + pd.offsets.MonthEnd(0)
+        rows.append({
+            "cusip": f"C{i:05d}",
+            "issue_date": issue,
+            "maturity_date": issue + pd.DateOffset(years=term),
+            "int_rate": np.nan if i % 20 == 0 else round(rng.uniform(0, 6), 3),
+            "int_payment_frequency": "Semi-Annual" if term > 1 else "None",
+            "quantity": float(rng.integers(1, 1000)),
+        })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture(scope="module")
+def bonds(inventory):
+    return [Bond(r.cusip, r.issue_date, r.maturity_date, r.int_rate, r.int_payment_frequency, r.quantity)
+            for r in inventory.itertuples()]
+
+
+@pytest.fixture(scope="module")
+def portfolio(inventory):
+    return BondPortfolio.from_inventory(inventory)
+
+
+def yield_curve(shift=0.0):
+    return interp1d(TENORS, RATES + shift, kind="linear", fill_value="extrapolate")
+
+
+def per_bond(bond, curve, as_of=AS_OF, year_frac=None):
+    """
+    Dirty PV and accrued interest of one Bond, one cashflow at a time (per unit);
+    year_frac(as_of, date) replaces ACT/365.25 in the discounting.
+    """
+    ao = np.datetime64(pd.Timestamp(as_of).date(), "D")
+    dates = bond.dates.astype("datetime64[D]")
+    pv = 0.0
+    for d, flow in zip(dates, bond.flows):
+        if d > ao:
+            t = (d - ao).astype(float) / 365.25 if year_frac is None else year_frac(ao, d)
+            pv += flow * np.exp(-curve(t) / 100 * t)
+    following = np.flatnonzero(dates > ao)
+    if len(following) == 0:
+        return pv, 0.0
+    nxt = following[0]
+    prev = np.datetime64(bond.issue_date.date(), "D") if nxt == 0 else dates[nxt - 1]
+    coupon = bond.face_value * bond.coupon_rate / 100 / bond.freq_per_year
+    return pv, coupon * (ao - prev).astype(float) / (dates[nxt] - prev).astype(float)
+
+
+def test_batch_matches_per_bond_pricing(bonds):
+    curve = yield_curve()
+    pv, accrued, clean, _, _ = Bond.price_batch_with_sensitivities(bonds, AS_OF, curve)
+    qty = np.array([b.quantity for b in bonds])
+    ref = np.array([per_bond(b, curve) for b in bonds]) * qty[:, None]
+
+    np.testing.assert_allclose(pv, ref[:, 0], rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(accrued, ref[:, 1], rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(clean, pv - accrued)
+
+
+def test_portfolio_matches_per_bond_pricing(bonds, portfolio):
+    curve = yield_curve()
+    pv, accrued, clean, _, _ = Bond.price_batch_with_sensitivities(portfolio, AS_OF, curve)
+    ref = np.array([per_bond(b, curve) for b in bonds]) * portfolio.quantity[:, None]
+
+    np.testing.assert_allclose(pv, ref[:, 0], rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(accrued, ref[:, 1], rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(clean, pv - accrued)
+
+
+def test_bond_list_and_portfolio_agree(bonds, portfolio):
+    from_bonds = Bond.price_batch_with_sensitivities(bonds, AS_OF, yield_curve())
+    from_inventory = Bond.price_batch_with_sensitivities(portfolio, AS_OF, yield_curve())
+    for a, b in zip(from_bonds, from_inventory):
+        np.testing.assert_allclose(a, b, rtol=1e-12, atol=1e-9)
+
+
+def reference_schedule(issue, maturity, freq):
+    """Coupon k on issue + k periods (month ends for a month-end issue), until one reaches maturity."""
+    month_end = issue == issue + pd.offsets.MonthEnd(0)
+    dates, date, k = [], issue, 0
+    while date < maturity:
+        k += 1
+        date = issue + pd.DateOffset(months=k * 12 // freq)
+        if month_end:
+            date = date + pd.offsets.MonthEnd(0)
+        dates.append(date)
+    return np.array(dates, dtype="datetime64[D]")
+
+
+def test_schedules_match_month_stepping(inventory):
+    freq = np.where(inventory["int_payment_frequency"] == "Semi-Annual", 2, 1)
+    clear_schedule_cache()
+    for _ in range(2):                                       # built, then served from the memo
+        offsets, dates = coupon_schedules(inventory["issue_date"], inventory["maturity_date"], freq)
+        for i, r in enumerate(inventory.itertuples()):
+            np.testing.assert_array_equal(dates[offsets[i]:offsets[i + 1]],
+                                          reference_schedule(r.issue_date, r.maturity_date, freq[i]))
+
+
+def test_analytic_sensitivities_match_bump(portfolio):
+    curve = yield_curve()
+    pv_b, ai_b, clean_b, dv01_b, krd_b = Bond.price_batch_with_sensitivities(portfolio, AS_OF, curve)
+    pv_a, ai_a, clean_a, dv01_a, krd_a, convexity = Bond.price_batch_analytic(portfolio, AS_OF, curve)
+
+    np.testing.assert_allclose(pv_a, pv_b, rtol=1e-12)
+    np.testing.assert_allclose(ai_a, ai_b, rtol=1e-12)
+    # a +1bp bump reprices to first order minus half the convexity term (to third order in ttm·1bp)
+    np.testing.assert_allclose(dv01_b, dv01_a - 0.5 * convexity, rtol=1e-5, atol=1e-9)
+    # bumped key rates carry the same second-order term, up to ½·ttm·1bp ≈ 0.15% at 30y
+    assert (np.abs(krd_a - krd_b) <= 2e-3 * dv01_a[:, None] + 1e-12).all()
+    # the key-rate ladder splits the parallel dv01 exactly
+    np.testing.assert_allclose(krd_a.sum(axis=1), dv01_a, rtol=1e-12)
+
+
+def test_method_switch_returns_analytic(portfolio):
+    analytic = Bond.price_batch_with_sensitivities(portfolio, AS_OF, yield_curve(), method="analytic")
+    reference = Bond.price_batch_analytic(portfolio, AS_OF, yield_curve())[:5]
+    for a, b in zip(analytic, reference):
+        np.testing.assert_array_equal(a, b)
+    with pytest.raises(ValueError):
+        Bond.price_batch_with_sensitivities(portfolio, AS_OF, yield_curve(), method="finite")
+
+
+# month ends fall on the coupon dates of the month-end issues
+@pytest.mark.parametrize("as_of", ["2024-03-15", "2024-06-30", "2024-12-31", "2025-02-28"])
+def test_accrued_interest_matches_per_bond(bonds, portfolio, as_of):
+    ref = np.array([per_bond(b, yield_curve(), as_of)[1] for b in bonds])
+    np.testing.assert_allclose(portfolio.accrued_interest(pd.Timestamp(as_of)), ref, rtol=1e-12, atol=1e-12)
+
+
+def test_scenarios_match_repricing(bonds):
+    shifts = np.array([0.0, 0.25, -1.0])
+    ref = np.stack([Bond.price_batch_with_sensitivities(bonds, AS_OF, yield_curve(s))[0] for s in shifts])
+    np.testing.assert_allclose(Bond.price_scenarios(bonds, AS_OF, yield_curve(), shifts=shifts), ref, rtol=1e-12)
+    np.testing.assert_allclose(Bond.price_scenarios(bonds, AS_OF, [yield_curve(s) for s in shifts]), ref,
+                               rtol=1e-12)
+
+
+@pytest.mark.parametrize("shifts", [None, np.array([0.0, 0.01, -0.5])])
+def test_dense_and_dates_layouts_agree(portfolio, shifts):
+    curves = [interp1d(TENORS, RATES * scale, fill_value="extrapolate") for scale in (0.8, 1.0, 1.1)]
+    dense = Bond.price_scenarios(portfolio, AS_OF, curves, shifts=shifts)
+    dates = Bond.price_scenarios(portfolio, AS_OF, curves, shifts=shifts, layout="dates")
+    assert dense.shape == (len(curves), len(portfolio))
+    np.testing.assert_allclose(dates, dense, rtol=1e-12, atol=1e-9)
+    with pytest.raises(ValueError):
+        Bond.price_scenarios(portfolio, AS_OF, curves, layout="sparse")
+
+
+def test_act_act_discounting_matches_per_bond(bonds, portfolio):
+    def act_act(start, end):
+        return year_fraction_act_act(start.astype(object), end.astype(object))
+
+    curve = yield_curve()
+    pv = Bond.price_batch_with_sensitivities(portfolio, AS_OF, curve, day_count="ACT/ACT")[0]
+    ref = np.array([per_bond(b, curve, year_frac=act_act)[0] for b in bonds]) * portfolio.quantity
+    np.testing.assert_allclose(pv, ref, rtol=1e-12, atol=1e-9)
+
+
+def test_accrued_interest_ignores_day_count(portfolio):
+    # AS_OF is in a semi-annual period that spans Dec 31, where ISDA year fractions differ
+    accrued = Bond.price_batch_with_sensitivities(portfolio, AS_OF, yield_curve())[1]
+    for day_count in ("ACT/365", "ACT/ACT"):
+        for method in ("bump", "analytic"):
+            other = Bond.price_batch_with_sensitivities(portfolio, AS_OF, yield_curve(), method=method,
+                                                        day_count=day_count)[1]
+            np.testing.assert_array_equal(other, accrued)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.bulk_load import bulk_upsert
+from data.data_source import DataSourcePool
+
+
+class RecordingSource:
+    """A pooled data source without a DSN (so bulk_upsert unnests through .query), recording the SQL."""
+
+    def __init__(self):
+        self.pool = DataSourcePool("market_data")
+        self.pool.dsn = None                     # even with MARKET_DATA_DSN set
+        self.sql = []
+
+    def query(self, sql):
+        self.sql.append(sql)
+
+
+def curve_rows(n):
+    return pd.DataFrame({"curve_type": "US Treasury Par", "curve_date": pd.Timestamp("2024-01-02"),
+                         "tenor_str": [f"T{i}" for i in range(n)], "rate": np.linspace(4, 5, n),
+                         "tenor_num": np.arange(n, dtype=float)})
+
+
+def test_unnest_chunks_quietly(capsys):
+    ds = RecordingSource()
+    stats = bulk_upsert(ds, "rate_curves", curve_rows(25), chunk_rows=10)
+    assert capsys.readouterr().out == ""
+    assert stats["rows"] == 25 and stats["transport"] == "unnest"
+    assert len(ds.sql) == 3
+    assert all("ON CONFLICT (curve_type, curve_date, tenor_str) DO UPDATE SET" in sql for sql in ds.sql)
+    assert "'{\"T20\",\"T21\",\"T22\",\"T23\",\"T24\"}'::text[]" in ds.sql[-1]
+
+
+def test_verbose_prints_a_summary(capsys):
+    bulk_upsert(RecordingSource(), "rate_curves", curve_rows(3), verbose=True)
+    assert "rate_curves: 3 rows" in capsys.readouterr().out
+
+
+def test_missing_columns_raise():
+    with pytest.raises(ValueError):
+        bulk_upsert(RecordingSource(), "rate_curves", curve_rows(3).drop(columns="rate"))
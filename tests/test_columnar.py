@@ -0,0 +1,43 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data.columnar import bfill, column_to_numpy, ffill, pivot_matrix
+
+
+def long_rows():
+    """(curve_date, tenor_num, rate) rows with missing cells and a few duplicated keys."""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"curve_date": rng.choice(pd.bdate_range("2024-01-01", periods=30).to_numpy(), 120),
+                         "tenor_num": rng.choice([0.25, 1.0, 2.0, 10.0, 30.0], 120),
+                         "rate": rng.normal(4, 0.5, 120)})
+
+
+def test_pivot_matrix_matches_pandas():
+    df = long_rows()
+    ref = df.pivot_table(index="curve_date", columns="tenor_num", values="rate", aggfunc="last")
+    rows, cols, matrix = pivot_matrix(df["curve_date"], df["tenor_num"], df["rate"])
+    np.testing.assert_array_equal(rows, ref.index.to_numpy())
+    np.testing.assert_array_equal(cols, ref.columns.to_numpy())
+    np.testing.assert_array_equal(matrix, ref.to_numpy())
+
+    labels = [30.0, 2.0, 7.0]
+    _, _, fixed = pivot_matrix(df["curve_date"], df["tenor_num"], df["rate"], col_labels=labels)
+    np.testing.assert_array_equal(fixed, ref.reindex(columns=labels).to_numpy())
+
+
+def test_fills_match_pandas():
+    _, _, matrix = pivot_matrix(*long_rows().to_numpy().T)
+    for axis in (0, 1):
+        frame = pd.DataFrame(matrix)
+        np.testing.assert_array_equal(ffill(matrix, axis=axis), frame.ffill(axis=axis).to_numpy())
+        np.testing.assert_array_equal(bfill(matrix, axis=axis), frame.bfill(axis=axis).to_numpy())
+
+
+def test_column_to_numpy_keeps_nulls_missing():
+    dates = column_to_numpy(pa.chunked_array([pa.array([dt.date(2024, 1, 2), None], pa.date32())]))
+    np.testing.assert_array_equal(dates, np.array(["2024-01-02", "NaT"], dtype="datetime64[D]"))
+    rates = column_to_numpy(pa.chunked_array([pa.array([4.5, None])]))
+    np.testing.assert_array_equal(rates, [4.5, np.nan])
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from models.empirical_covariance import EmpiricalCovarianceModel
+from models.ewma_covariance import EWMACovarianceModel
+from models.rate_cone import (PERCENTILES, SimulationContext, analytic_cone, cholesky_factor, cone_quantiles,
+                              is_gaussian, quantile_standard_errors, simulate_cone)
+
+# daily rate deltas (percent) of 5 tenors: correlated, volatility rising with tenor
+VOLS = np.linspace(0.05, 0.1, 5)
+COV = (0.6 + 0.4 * np.eye(5)) * np.outer(VOLS, VOLS)
+BASE = np.array([4.0, 4.1, 4.2, 4.3, 4.4])
+
+
+@pytest.fixture(scope="module")
+def deltas():
+    """400 days of deltas; the last tenor is quoted only from day 150."""
+    X = np.random.default_rng(0).normal(size=(400, 5)) @ np.linalg.cholesky(COV).T
+    X[:150, 4] = np.nan
+    return X
+
+
+def test_ewma_matches_weighted_sums(deltas):
+    w = 0.94 ** np.arange(len(deltas) - 1, -1, -1)
+    ref = np.empty((5, 5))
+    for i in range(5):
+        for j in range(5):
+            both = ~np.isnan(deltas[:, i]) & ~np.isnan(deltas[:, j])
+            ref[i, j] = np.sum(w[both] * deltas[both, i] * deltas[both, j]) / np.sum(w[both])
+    np.testing.assert_allclose(EWMACovarianceModel(decay=0.94).fit(deltas).covariance_, ref, rtol=1e-12)
+
+
+def test_ewma_updates_match_fit(deltas):
+    fitted = EWMACovarianceModel(decay=0.94).fit(deltas[:300]).covariance_
+    stepped = EWMACovarianceModel(decay=0.94).partial_fit(deltas[:200]).partial_fit(deltas[200:300])
+    path = EWMACovarianceModel(decay=0.94).covariance_path(deltas)
+    np.testing.assert_allclose(stepped.covariance_, fitted, rtol=1e-10)
+    np.testing.assert_allclose(path[299], fitted, rtol=1e-10)
+
+
+def test_analytic_cone_matches_sampled_quantiles():
+    days = 30
+    sims = BASE + np.random.default_rng(1).multivariate_normal(np.zeros(5), COV * days, 400_000)
+    sigma = np.sqrt(np.diag(COV) * days)
+    sampled = np.quantile(sims, np.array(PERCENTILES) / 100, axis=0)
+    assert (np.abs(sampled - analytic_cone(BASE, COV, days)) < 0.02 * sigma).all()
+    assert is_gaussian(EmpiricalCovarianceModel())
+
+
+def test_simulated_cone_converges_to_analytic():
+    normals = SimulationContext(["2024-03-15"], 400_000, seed=2).normals("2024-03-15", 5)
+    sims = simulate_cone(BASE, cholesky_factor(COV), 30, normals)
+    sigma = np.sqrt(np.diag(COV) * 30)
+    assert (np.abs(cone_quantiles(sims) - analytic_cone(BASE, COV, 30)) < 0.02 * sigma).all()
+
+
+def test_cholesky_factor_of_a_singular_covariance():
+    cov = np.outer(VOLS, VOLS)                  # rank one: perfectly correlated tenors
+    L = cholesky_factor(cov)
+    np.testing.assert_allclose(L @ L.T, cov, atol=1e-15)
+
+
+def test_draws_depend_only_on_seed_and_date():
+    dates = ["2024-03-13", "2024-03-14", "2024-03-15"]
+    a, b = SimulationContext(dates, 64, seed=7), SimulationContext(dates, 64, seed=7)
+    last = b.normals(dates[2], 5)                    # asked for first on b, last on a
+    a.normals(dates[0], 5)
+    np.testing.assert_array_equal(a.normals(dates[2], 5), last)
+    np.testing.assert_array_equal(a.normals(dates[2], 5), last)
+    assert not np.allclose(a.normals(dates[1], 5), last)
+
+
+@pytest.mark.parametrize("sampling", ["pseudo", "antithetic", "sobol"])
+def test_sampling_error_within_standard_errors(sampling):
+    ctx = SimulationContext(["2024-03-15"], 2 ** 15, seed=3, sampling=sampling)
+    sims = simulate_cone(BASE, cholesky_factor(COV), 30, ctx.normals("2024-03-15", 5))
+    error = np.abs(cone_quantiles(sims) - analytic_cone(BASE, COV, 30))
+    se = quantile_standard_errors(sims, ctx.n_replicates)
+    inner = [PERCENTILES.index(p) for p in (10, 50, 90)]    # the 1%/99% standard errors read low
+    assert (error[inner] < 4 * se[inner] + 1e-12).all()
+    if sampling == "antithetic":
+        np.testing.assert_allclose(cone_quantiles(sims, [50])[0], BASE, rtol=1e-14)
+
+
+def test_sampling_arguments_are_checked():
+    with pytest.raises(ValueError):
+        SimulationContext(["2024-03-15"], 64, sampling="halton")
+    with pytest.raises(ValueError):
+        SimulationContext(["2024-03-15"], 60, n_replicates=8)
@@ -0,0 +1,68 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scipy.interpolate import PchipInterpolator, interp1d
+
+from models.curve import Curve, TenorGrid
+
+TENORS = np.array([1 / 12, 2 / 12, 0.25, 0.5, 1, 2, 3, 5, 7, 10, 20, 30])
+RATES = 4 + 0.3 * np.log1p(TENORS) + np.array([0, .1, -.05, .2, 0, 0, .1, -.1, 0, .05, .1, 0])
+T = np.linspace(-1, 40, 2001)
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_linear_matches_interp1d():
+    ref = interp1d(TENORS, RATES, fill_value="extrapolate")(T)
+    np.testing.assert_allclose(Curve(TENORS, RATES)(T), ref, rtol=1e-13, atol=1e-12)
+
+
+def test_flat_extrapolation_matches_np_interp():
+    curve = Curve(TENORS, RATES, extrapolate="flat")
+    np.testing.assert_allclose(curve(T), np.interp(T, TENORS, RATES), rtol=1e-13, atol=1e-12)
+
+
+def test_monotone_cubic_matches_pchip():
+    inside = np.linspace(TENORS[0], TENORS[-1], 2001)
+    curve = Curve(TENORS, RATES, method="monotone_cubic")
+    np.testing.assert_allclose(curve(inside), PchipInterpolator(TENORS, RATES)(inside), rtol=1e-12, atol=1e-12)
+
+
+def test_log_df_hits_knots_and_discounts():
+    curve = Curve(TENORS, RATES, method="log_df")
+    np.testing.assert_allclose(curve(TENORS), RATES, rtol=1e-12)
+    np.testing.assert_allclose(curve.df(T), np.exp(-curve(T) / 100 * T), rtol=1e-13)
+
+
+def test_shapes_nan_and_unsorted_knots():
+    t = np.concatenate([T, [np.nan]]).reshape(-1, 1)
+    out = Curve(TENORS, RATES)(t)
+    assert out.shape == t.shape and np.isnan(out[-1, 0])
+    order = np.random.default_rng(0).permutation(len(TENORS))
+    np.testing.assert_allclose(Curve(TENORS[order], RATES[order])(T), Curve(TENORS, RATES)(T))
+
+
+def test_shifts_and_sums_on_a_shared_grid():
+    grid = TenorGrid(T)
+    base = Curve(TENORS, RATES)
+    shock_tenors = np.array([0.25, 0.5, 1, 2, 3, 5, 7, 10, 20, 30])
+    shock = Curve(shock_tenors, np.linspace(0, 1, 10), extrapolate="flat")
+    np.testing.assert_allclose(base.shifted(0.25)(grid), base(T) + 0.25, rtol=1e-13)
+    np.testing.assert_allclose((base + shock)(grid), base(T) + shock(T), rtol=1e-13)
+
+
+def test_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        Curve(TENORS, RATES, method="spline")
+    with pytest.raises(ValueError):
+        Curve(TENORS, RATES, extrapolate="none")
+
+
+def test_treasury_curve_imports_without_domino():
+    # a fresh interpreter, without the conftest stub: only the DB helpers need the Domino SDK
+    code = ("import sys; import data.treasury_curve as tc; "
+            "tc.bump_curve(tc.make_yield_curve([1, 2], [4, 5]), 25)(1.5); "
+            "assert 'data.data_source' not in sys.modules")
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
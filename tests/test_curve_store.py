@@ -0,0 +1,92 @@
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.curve_store import CurveStore
+
+DATES = pd.bdate_range("2024-01-01", periods=60).date
+
+
+def rate_curves(dates, tenors, level=4.0):
+    """rate_curves rows (curve_date, tenor_num, rate) of one curve type; the rate encodes (date, tenor)."""
+    return pd.DataFrame([(d, t, level + i / 100 + t / 1000) for i, d in enumerate(dates) for t in tenors],
+                        columns=["curve_date", "tenor_num", "rate"])
+
+
+@pytest.fixture
+def table(monkeypatch):
+    """The rows CurveStore reads, by date range; tests append to it to publish new curves."""
+    rows = [rate_curves(DATES[:40], [1.0, 2.0, 10.0])]
+
+    def query(self, start_date, end_date):
+        df = pd.concat(rows, ignore_index=True)
+        return df[(df["curve_date"] >= start_date) & (df["curve_date"] <= end_date)]
+
+    monkeypatch.setattr(CurveStore, "_query", query)
+    return rows
+
+
+def test_lookups(table):
+    store = CurveStore.load(None, DATES[0], DATES[-1])
+    assert len(store) == 40 and DATES[5] in store and DATES[45] not in store
+    np.testing.assert_array_equal(store.get(DATES[5]), 4.05 + np.array([1.0, 2.0, 10.0]) / 1000)
+    assert store.as_of(DATES[45])[0] == DATES[39]
+    assert store.frame(DATES[10], DATES[19]).shape == (10, 3)
+    tenors, rates = store.quoted(DATES[5])
+    np.testing.assert_array_equal(store.curve(DATES[5])(tenors), rates)
+    with pytest.raises(KeyError):
+        store.get(DATES[45])
+
+
+def test_refresh_publishes_a_new_snapshot(table):
+    store = CurveStore.load(None, DATES[0], DATES[-1])
+    dates, tenors, rates = store.dates, store.tenors, store.rates
+    assert not rates.flags.writeable
+
+    table.append(rate_curves(DATES[40:45], [1.0, 5.0]))
+    assert store.refresh(DATES[-1]) == 5
+    assert len(dates) == 40 and rates.shape == (40, 3)                 # earlier snapshot untouched
+    np.testing.assert_array_equal(store.tenors, [1.0, 2.0, 5.0, 10.0])
+    tenors, rates = store.quoted(DATES[42])
+    np.testing.assert_array_equal(tenors, [1.0, 5.0])
+    assert store.refresh(DATES[44]) == 0
+
+
+@pytest.fixture
+def busy_switching():
+    """Switch threads as often as the interpreter allows, so torn reads actually interleave."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_readers_see_whole_snapshots_during_refresh(table, busy_switching):
+    store = CurveStore.load(None, DATES[0], DATES[39])
+    failures = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            try:
+                d = DATES[np.random.randint(40)]
+                tenors, rates = store.quoted(d)
+                np.testing.assert_allclose(rates, 4.0 + list(DATES).index(d) / 100 + tenors / 1000)
+                store.frame()                   # raises if its arrays come from different loads
+            except Exception as e:
+                failures.append(e)
+                return
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for t in readers:
+        t.start()
+    for k in range(50):                     # every load adds a tenor to the union
+        table[:] = [rate_curves(DATES[:40], [1.0, 2.0, 10.0] + [20.0 + j for j in range(k + 1)])]
+        store.load_range(DATES[0], DATES[39])
+    done.set()
+    for t in readers:
+        t.join()
+    assert not failures, failures[0]
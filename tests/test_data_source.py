@@ -0,0 +1,43 @@
+import threading
+import time
+
+from data.data_source import DataSourcePool
+
+
+def make_pool(max_clients):
+    pool = DataSourcePool("market_data", max_clients=max_clients)
+    pool._new_client = object                # a fresh stand-in client per creation
+    return pool
+
+
+def test_nested_checkouts_reuse_the_thread_client():
+    pool = make_pool(1)
+    with pool.checkout() as outer:
+        with pool.checkout() as inner:           # a second slot would deadlock at max_clients=1
+            assert inner is outer
+    with pool.checkout() as again:
+        assert again is outer
+    assert pool.stats()["clients_created"] == 1
+
+
+def test_concurrent_checkouts_stay_under_the_cap():
+    pool = make_pool(3)
+    lock = threading.Lock()
+    in_flight, peak = [0], [0]
+
+    def work():
+        with pool.checkout():
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = pool.stats()
+    assert peak[0] <= 3 and stats["clients_created"] <= 3 and stats["checkouts"] == 12
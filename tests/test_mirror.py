@@ -0,0 +1,184 @@
+import datetime as dt
+import importlib
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from data import mirror
+
+KEY = ["curve_type", "curve_date", "tenor_str"]
+TENORS = {"T1": 1.0, "T5": 5.0, "T10": 10.0}
+
+
+class FakeRateCurves:
+    """
+    rate_curves as the mirror's queries see it: each write is stamped with the server clock;
+    rows of an open transaction are stamped at its start and stay invisible until commit. The
+    clock moves on an hour with every write and every read of pg_stat_activity.
+    """
+
+    def __init__(self):
+        self.clock = pd.Timestamp("2024-06-01 12:00", tz="UTC")
+        self.rows = pd.DataFrame(columns=KEY + ["rate", "tenor_num", "inserted_at"])
+        self.pending = None
+        self.txn_start = None
+        self.hidden = 0
+
+    def tick(self):
+        self.clock += pd.Timedelta(hours=1)
+        return self.clock
+
+    def frame(self, dates, rate=4.0):
+        return pd.DataFrame([("US Treasury Par", d, t, rate, n) for d in dates for t, n in TENORS.items()],
+                            columns=KEY + ["rate", "tenor_num"])
+
+    def _upsert(self, held, df, stamp):
+        df = df.assign(inserted_at=stamp)
+        return pd.concat([held, df]).drop_duplicates(KEY, keep="last").reset_index(drop=True)
+
+    def write(self, df):
+        self.rows = self._upsert(self.rows, df, self.tick())
+
+    def begin(self, df):
+        self.txn_start = self.tick()
+        self.pending = df
+
+    def commit(self):
+        self.tick()
+        self.rows = self._upsert(self.rows, self.pending, self.txn_start)
+        self.pending = self.txn_start = None
+
+    def query_arrow(self, ds, sql, params=None, types=None):
+        stamp = pa.timestamp("us", tz="UTC")
+        if "pg_stat_activity" in sql:
+            return pa.table({"now": pa.array([self.tick()], stamp), "oldest": pa.array([self.txn_start], stamp),
+                             "hidden": [self.hidden]})
+        if "count(*)" in sql:
+            years = self.rows.groupby(pd.to_datetime(self.rows["curve_date"]).dt.year)
+            return pa.table({"year": years.size().index.tolist(), "n": years.size().tolist(),
+                             "wm": pa.array(years["inserted_at"].max().tolist(), stamp)})
+        rows = self.rows[self.rows["inserted_at"] <= params["upto"]]
+        if "since" in params:
+            rows = rows[rows["inserted_at"] > params["since"]]
+        return pa.table({
+            "curve_type": rows["curve_type"].tolist(),
+            "curve_date": pa.array(rows["curve_date"].tolist(), pa.date32()),
+            "tenor_str": rows["tenor_str"].tolist(),
+            "rate": pa.array(rows["rate"].tolist(), pa.float64()),
+            "tenor_num": pa.array(rows["tenor_num"].tolist(), pa.float64()),
+            "inserted_at": pa.array(rows["inserted_at"].tolist(), stamp),
+        })
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeRateCurves()
+    monkeypatch.setattr(mirror, "query_arrow", db.query_arrow)
+    return db
+
+
+def dates(start, periods):
+    return pd.bdate_range(start, periods=periods).date
+
+
+def mirrored(root):
+    return (mirror.read("rate_curves", root=root).to_pandas()
+            .sort_values(KEY, ignore_index=True)[KEY + ["rate"]])
+
+
+def expected(db):
+    return db.rows.sort_values(KEY, ignore_index=True)[KEY + ["rate"]]
+
+
+def test_incremental_sync(db, tmp_path):
+    db.write(db.frame(dates("2023-12-01", 40)))
+    first = mirror.sync(None, "rate_curves", root=tmp_path, verbose=False)
+    assert first["full"] and first["fetched"] == first["rows"] == 120
+    pd.testing.assert_frame_equal(mirrored(tmp_path), expected(db), check_dtype=False)
+
+    # a revision of two old dates plus three new ones: only those rows are fetched
+    db.write(pd.concat([db.frame(dates("2023-12-04", 2), rate=9.0), db.frame(dates("2024-02-01", 3))]))
+    second = mirror.sync(None, "rate_curves", root=tmp_path, verbose=False)
+    assert not second["full"] and second["fetched"] == 15 and second["rows"] == 129
+    pd.testing.assert_frame_equal(mirrored(tmp_path), expected(db), check_dtype=False)
+
+    idle = mirror.sync(None, "rate_curves", root=tmp_path, verbose=False)
+    assert not idle["full"] and idle["fetched"] == 0
+
+    window = mirror.read("rate_curves", "2023-12-04", "2023-12-05", where={"tenor_str": ["T1", "T10"]},
+                         root=tmp_path).to_pandas()
+    assert len(window) == 4 and (window["rate"] == 9.0).all()
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_late_commit_is_fetched_incrementally(db, tmp_path):
+    db.write(db.frame(dates("2024-01-01", 10)))
+    mirror.sync(None, "rate_curves", root=tmp_path, verbose=False)
+
+    db.begin(db.frame(dates("2024-01-15", 2)))                 # stamped now, committed later
+    db.write(db.frame(dates("2024-01-17", 1)))
+    during = mirror.sync(None, "rate_curves", root=tmp_path, verbose=False)
+    assert during["fetched"] == 3 and during["rows"] == 33
+    db.commit()
+
+    after = mirror.sync(None, "rate_curves", root=tmp_path, verbose=False)
+    assert not after["full"] and after["rows"] == 39
+    pd.testing.assert_frame_equal(mirrored(tmp_path), expected(db), check_dtype=False)
+
+
+def test_hidden_sessions_fall_back_to_overlap(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(mirror, "SYNC_OVERLAP", dt.timedelta(seconds=30))
+    db.hidden = 1
+    db.write(db.frame(dates("2024-01-01", 10)))
+    mirror.sync(None, "rate_curves", root=tmp_path, verbose=False)
+    state = mirror._read_state("rate_curves", tmp_path)
+    assert state["since"] == state["watermark"] - dt.timedelta(seconds=30)
+
+
+def test_deletes_resync_into_a_new_generation(db, tmp_path, monkeypatch):
+    db.write(db.frame(dates("2024-01-01", 10)))
+    mirror.sync(None, "rate_curves", root=tmp_path, verbose=False)
+    old = mirror._current_dir("rate_curves", tmp_path)
+
+    db.rows = db.rows[db.rows["curve_date"] != dates("2024-01-01", 1)[0]].reset_index(drop=True)
+    resync = mirror.sync(None, "rate_curves", root=tmp_path, verbose=False)
+    assert resync["full"] and resync["rows"] == 27
+    assert mirror._current_dir("rate_curves", tmp_path) != old
+    assert (old / "_retired").exists() and list(old.rglob("part.parquet"))     # kept for readers
+    pd.testing.assert_frame_equal(mirrored(tmp_path), expected(db), check_dtype=False)
+
+    monkeypatch.setattr(mirror, "RETIRED_GRACE", 0)
+    mirror.sync(None, "rate_curves", root=tmp_path, verbose=False)
+    assert not old.exists()
+
+
+def test_deletes_offset_by_inserts_in_another_year(db, tmp_path):
+    db.write(db.frame(dates("2023-12-25", 10)))
+    mirror.sync(None, "rate_curves", root=tmp_path, verbose=False)
+
+    # the table's row count is unchanged, but 2023 lost a date and 2024 gained one
+    db.rows = db.rows[db.rows["curve_date"] != dates("2023-12-25", 1)[0]].reset_index(drop=True)
+    db.write(db.frame(dates("2024-02-01", 1)))
+    resync = mirror.sync(None, "rate_curves", root=tmp_path, verbose=False)
+    assert resync["full"] and resync["rows"] == 30
+    pd.testing.assert_frame_equal(mirrored(tmp_path), expected(db), check_dtype=False)
+
+
+@pytest.fixture
+def default_mirror(monkeypatch):
+    """data.mirror as imported with MARKET_DATA_MIRROR unset."""
+    monkeypatch.delenv("MARKET_DATA_MIRROR", raising=False)
+    yield importlib.reload(mirror)
+    monkeypatch.undo()
+    importlib.reload(mirror)
+
+
+def test_mirror_is_opt_in(default_mirror, monkeypatch):
+    assert default_mirror.MIRROR_DIR is None
+    queries = []
+    monkeypatch.setattr(default_mirror, "query_arrow", lambda ds, sql, params=None: queries.append(params))
+    default_mirror.load(None, "rate_curves", "2024-01-01", "2024-01-31", where={"curve_type": "US Treasury Par"})
+    assert queries == [{"start_date": "2024-01-01", "end_date": "2024-01-31", "w0": "US Treasury Par"}]
+    with pytest.raises(RuntimeError):
+        default_mirror.sync(None, "rate_curves")
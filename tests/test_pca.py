@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from sklearn.decomposition import PCA
+
+from models.pca_model import batched_legacy_pca, batched_rolling_pca, legacy_pca, rolling_pca
+
+
+@pytest.fixture(scope="module")
+def levels():
+    """Three-factor (level / slope / curvature) rate levels on 10 tenors."""
+    rng = np.random.default_rng(0)
+    factors = np.cumsum(rng.normal(size=(900, 3)) * [0.05, 0.02, 0.01], axis=0)
+    x = np.linspace(-1, 1, 10)
+    loadings = np.array([np.ones(10), x, x ** 2 - 0.3])
+    return 4 + factors @ loadings + rng.normal(size=(900, 10)) * 0.003
+
+
+def windows(n_rows, length=300, step=37):
+    ends = np.arange(length, n_rows + 1, step)
+    return ends - length, ends
+
+
+def reference_pca(X, n):
+    """components, explained variance ratio, mean and scores from scikit-learn's PCA."""
+    pca = PCA(n_components=n)
+    scores = pca.fit_transform(X)
+    return pca.components_, pca.explained_variance_ratio_, pca.mean_, scores
+
+
+def aligned(components, reference):
+    """components with each row's sign matched to reference (PCA loadings are sign-free)."""
+    signs = np.sign(np.sum(components * reference, axis=-1, keepdims=True))
+    return components * signs
+
+
+def assert_matches_per_slice_pca(engine, levels):
+    starts, ends = windows(len(levels))
+    components, ratio, mean, today, mse, n_obs = engine(levels, starts, ends, 3)
+    for w, (s, e) in enumerate(zip(starts, ends)):
+        ref_components, ref_ratio, ref_mean, ref_scores = reference_pca(levels[s:e], 3)
+        np.testing.assert_allclose(aligned(components[w], ref_components), ref_components, atol=1e-8)
+        np.testing.assert_allclose(ratio[w], ref_ratio, rtol=1e-9)
+        np.testing.assert_allclose(mean[w], ref_mean, rtol=1e-12)
+        np.testing.assert_allclose(np.abs(today[w]), np.abs(ref_scores[-1]), atol=1e-8)
+        Xc = levels[s:e] - ref_mean
+        np.testing.assert_allclose(mse[w], np.mean((Xc - ref_scores @ ref_components) ** 2), rtol=1e-8)
+    np.testing.assert_array_equal(n_obs, ends - starts)
+
+
+def test_rolling_pca_matches_per_slice_pca(levels):
+    assert_matches_per_slice_pca(rolling_pca, levels)
+
+
+def test_windows_in_any_order(levels):
+    starts, ends = windows(len(levels))
+    order = np.random.default_rng(1).permutation(len(starts))
+    forward = rolling_pca(levels, starts, ends, 3)
+    shuffled = rolling_pca(levels, starts[order], ends[order], 3)
+    for a, b in zip(forward, shuffled):
+        np.testing.assert_allclose(a[order], b, rtol=1e-9, atol=1e-10)
+
+
+def test_batched_rolling_pca_matches_per_slice_pca(levels):
+    assert_matches_per_slice_pca(batched_rolling_pca, levels)
+
+
+@pytest.mark.parametrize("n_iter", [1, 3])
+def test_batched_legacy_matches_legacy_pca(levels, n_iter):
+    starts, ends = windows(len(levels))
+    components, ratio, mean, today, mse, _ = batched_legacy_pca(levels, starts, ends, 3, n_iter=n_iter)
+    for w, (s, e) in enumerate(zip(starts, ends)):
+        ref_components, ref_ratio, ref_mean, ref_scores, _ = legacy_pca(levels[s:e], 3, n_iter=n_iter)
+        np.testing.assert_allclose(components[w], ref_components, atol=1e-9)
+        np.testing.assert_allclose(ratio[w], ref_ratio, rtol=1e-9)
+        np.testing.assert_allclose(today[w], ref_scores[-1], atol=1e-9)
+
+
+def test_legacy_tolerance_mode_converges(levels):
+    X = levels[:300]
+    ref_components, ref_ratio, *_ = reference_pca(X, 3)
+    components, ratio, _, _, _, steps = legacy_pca(X, 3, tol=1e-8, return_n_iter=True)
+    assert steps < 100
+    np.testing.assert_allclose(aligned(components, ref_components), ref_components, atol=1e-6)
+    np.testing.assert_allclose(ratio, ref_ratio, rtol=1e-8)
+
+
+def test_legacy_block_is_padded_to_n_oversamples(levels):
+    X = levels[:300]
+    ref_components, *_ = reference_pca(X, 2)
+    # padded to all 10 tenors, the first Rayleigh–Ritz step is already exact
+    components, *_, steps = legacy_pca(X, 2, tol=1e-10, n_oversamples=8, return_n_iter=True)
+    assert steps == 1
+    np.testing.assert_allclose(aligned(components, ref_components), ref_components, atol=1e-8)
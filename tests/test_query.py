@@ -0,0 +1,77 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data import query
+from data.query import Statement, run_query, sql_literal
+
+
+class RecordingSource:
+    """A data source client that records the SQL it is sent."""
+
+    def __init__(self):
+        self.sql = []
+
+    def query(self, sql):
+        self.sql.append(sql)
+        return pd.DataFrame()
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """run_query on the rendered-literal path (as through the Domino client), returning the SQL."""
+    monkeypatch.setattr(query, "psycopg", None)
+    ds = RecordingSource()
+
+    def run(sql, params=None):
+        run_query(ds, sql, params)
+        return ds.sql[-1]
+    return run
+
+
+def test_binds_render_as_typed_literals(rendered):
+    sql = rendered("SELECT * FROM rate_curves WHERE curve_type = :ct AND curve_date BETWEEN :a AND :b "
+                   "AND tenor_num = ANY(:tenors) AND rate > :r AND n = :n",
+                   {"ct": "US Treasury Par", "a": dt.date(2024, 1, 5), "b": pd.Timestamp("2024-01-10"),
+                    "tenors": np.array([0.25, 2.0]), "r": np.float64(0.1), "n": np.int64(3)})
+    assert sql == ("SELECT * FROM rate_curves WHERE curve_type = 'US Treasury Par' "
+                   "AND curve_date BETWEEN '2024-01-05'::date AND '2024-01-10T00:00:00'::timestamp "
+                   "AND tenor_num = ANY('{0.25,2.0}'::float8[]) AND rate > '0.1'::float8 AND n = 3")
+
+
+def test_quotes_casts_and_comments_are_not_binds(rendered):
+    sql = rendered("SELECT a::date, ':x', \"b:c\" FROM t -- :x\nWHERE c = :x /* :y */", {"x": 1})
+    assert sql == "SELECT a::date, ':x', \"b:c\" FROM t -- :x\nWHERE c = 1 /* :y */"
+
+
+def test_values_are_escaped(rendered):
+    sql = rendered("SELECT count(*) FROM t WHERE a = :a AND b = ANY(:b)", {"a": "x' OR '1'='1", "b": ["o'k", None]})
+    assert sql == "SELECT count(*) FROM t WHERE a = 'x'' OR ''1''=''1' AND b = ANY('{\"o''k\",NULL}'::text[])"
+
+
+def test_missing_bind_raises(rendered):
+    with pytest.raises(KeyError):
+        rendered("SELECT 1 WHERE a = :a AND b = :b", {"a": 1})
+
+
+@pytest.mark.parametrize("value, literal", [
+    (None, "NULL"),
+    (True, "TRUE"),
+    (np.datetime64("2024-02-29"), "'2024-02-29T00:00:00'::timestamp"),
+    (dt.datetime(2024, 1, 2, 3, 4, tzinfo=dt.timezone.utc), "'2024-01-02T03:04:00+00:00'::timestamptz"),
+    (np.array(["2024-01-02", "NaT"], dtype="datetime64[D]"), "'{2024-01-02,NULL}'::date[]"),
+    ([dt.date(2024, 1, 2)], "'{2024-01-02}'::date[]"),
+    (np.array([1, 2]), "'{1,2}'::int8[]"),
+])
+def test_sql_literal(value, literal):
+    assert sql_literal(value) == literal
+
+
+def test_statements_are_parsed_once():
+    sql = "SELECT :a AS a"
+    first = query.parsed_statements.get(sql)
+    assert query.parsed_statements.get(sql) is first
+    assert first.names == ("a",) and first.pg_sql == "SELECT %(a)s AS a"
+    assert Statement("SELECT '%' || :a").pg_sql == "SELECT '%%' || %(a)s"
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.rolling_covariance import RollingCovariance, window_covariances
+
+
+@pytest.fixture(scope="module")
+def deltas():
+    """Daily deltas with a late-starting series, a few sporadic gaps and a three-day outage."""
+    X = np.random.default_rng(0).normal(size=(400, 5))
+    X[:120, 4] = np.nan
+    X[[50, 260], 2] = np.nan
+    X[200:203, 0] = np.nan
+    return X
+
+
+def reference(X, lo, hi, columns):
+    """np.cov of the rows after the last NaN row (in the chosen columns) of the window."""
+    block = X[lo:hi][:, columns]
+    bad = np.flatnonzero(np.isnan(block).any(axis=1))
+    block = block[bad[-1] + 1:] if len(bad) else block
+    return np.cov(block, rowvar=False, ddof=0)
+
+
+def test_window_matches_np_cov(deltas):
+    rc = RollingCovariance(deltas, ddof=0)
+    for lo, hi, columns in [(0, 100, [0, 1, 2, 3]), (120, 400, [0, 1, 2, 3, 4]), (150, 260, [1, 3]),
+                            (190, 300, [0, 1]), (0, 400, [1, 3])]:
+        cov, mean, n_obs, first = rc.window(lo, hi, columns)
+        np.testing.assert_allclose(cov, reference(deltas, lo, hi, columns), rtol=1e-12, atol=1e-14)
+        assert n_obs == hi - first
+        np.testing.assert_allclose(mean, deltas[first:hi][:, columns].mean(axis=0), rtol=1e-12, atol=1e-14)
+
+
+def test_covariances_trim_each_window(deltas):
+    rc = RollingCovariance(deltas, ddof=0)
+    ends = np.r_[np.arange(230, 260, 7), np.arange(270, 400, 13)]
+    starts = ends - 100
+    covs = rc.covariances(starts, ends)
+    for cov, lo, hi in zip(covs, starts, ends):
+        np.testing.assert_allclose(cov, reference(deltas, lo, hi, list(range(5))), rtol=1e-12, atol=1e-14)
+        np.testing.assert_allclose(cov, rc.window(lo, hi)[0], rtol=1e-12, atol=1e-14)
+
+
+def test_covariances_raise_on_empty_window(deltas):
+    rc = RollingCovariance(deltas, ddof=0)
+    with pytest.raises(ValueError):
+        rc.covariances([195], [203])            # rows 200-202 are NaN in column 0
+
+
+def test_dates_and_model(deltas):
+    index = pd.bdate_range("2023-01-02", periods=len(deltas)).to_numpy().astype("datetime64[D]")
+    rc = RollingCovariance(deltas, index=index)
+    lo, hi = rc.rows(index[130], index[199])
+    assert (lo, hi) == (130, 200)
+    np.testing.assert_allclose(rc.covariance(index[130], index[199]), reference(deltas, 130, 200, range(5)),
+                               rtol=1e-12, atol=1e-14)
+    np.testing.assert_allclose(rc.model(130, 200).covariance_, rc.window(130, 200)[0])
+
+
+def test_window_covariances_match_np_cov():
+    X = np.random.default_rng(1).normal(size=(300, 4)) + 100      # offset: conditioning of the prefix sums
+    starts, ends = np.array([0, 10, 150]), np.array([60, 300, 151 + 40])
+    cov, mean, n_obs = window_covariances(X, starts, ends)
+    for w, (s, e) in enumerate(zip(starts, ends)):
+        np.testing.assert_allclose(cov[w], np.cov(X[s:e], rowvar=False), rtol=1e-10)
+        np.testing.assert_allclose(mean[w], X[s:e].mean(axis=0), rtol=1e-13)
+    np.testing.assert_array_equal(n_obs, ends - starts)
@@ -0,0 +1,72 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.interpolate import interp1d
+
+from data.treasury_curve import shocks
+from models.pca_model import make_pca_bumped_curve
+from models.pricing_models.bond_model import Bond
+from models.pricing_models.bond_portfolio import BondPortfolio
+from models.pricing_models.valuation_batch import KEY_COLS, PCA_SHOCKS, PCA_TENORS, value_date_range
+
+DATES = [dt.date(2024, 3, 13), dt.date(2024, 3, 14), dt.date(2024, 3, 15)]
+TENORS = np.array([1 / 12, 2 / 12, 0.25, 0.5, 1, 2, 3, 5, 7, 10, 20, 30])
+RATES = 4 + 0.3 * np.log1p(TENORS)
+EVR = np.array([0.85, 0.1, 0.04])
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    """The same 60 bonds on three inventory dates, with a curve and PCA results per date."""
+    rng = np.random.default_rng(0)
+    n = 60
+    issue = pd.Timestamp("2023-01-02") + pd.to_timedelta(rng.integers(0, 400, n), unit="D")
+    bonds = pd.DataFrame({
+        "cusip": [f"C{i:05d}" for i in range(n)],
+        "int_rate": np.where(np.arange(n) % 15 == 0, np.nan, rng.uniform(0, 6, n).round(3)),
+        "issue_date": issue,
+        "maturity_date": [d + pd.DateOffset(years=int(t)) for d, t in zip(issue, rng.choice([2, 5, 10, 30], n))],
+        "price_per100": 100.0,
+        "quantity": rng.integers(1, 1000, n).astype(float),
+        "int_payment_frequency": "Semi-Annual",
+    })
+    inv = pd.concat([bonds.assign(inventory_date=d) for d in DATES], ignore_index=True)
+    curves = {d: interp1d(TENORS, RATES + 0.05 * g, fill_value="extrapolate") for g, d in enumerate(DATES)}
+    pca = {d: (np.linalg.qr(rng.normal(size=(len(PCA_TENORS), 3)))[0].T, EVR) for d in DATES}
+    return inv, curves, pca
+
+
+def test_blocks_match_single_date_pricing(inputs):
+    inv, curves, pca = inputs
+    results, errors = value_date_range(inv, curves, pca, dates_per_block=2)
+    assert errors == [] and len(results) == len(inv)
+
+    for d in DATES:
+        rows = inv[inv["inventory_date"] == d]
+        got = results[results["valuation_date"] == d].set_index("cusip").loc[rows["cusip"]]
+        portfolio, as_of = BondPortfolio.from_inventory(rows), pd.Timestamp(d)
+        pv, accrued, clean, dv01, krd = Bond.price_batch_with_sensitivities(portfolio, as_of, curves[d],
+                                                                            method="analytic")
+        np.testing.assert_allclose(got["price_closedform"], pv, rtol=1e-12)
+        np.testing.assert_allclose(got["accrued_interest_closedform"], accrued, rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(got["dv01"], dv01, rtol=1e-12)
+        np.testing.assert_allclose(got[KEY_COLS], krd, rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(got["pca2_dv01"], EVR[1] * dv01, rtol=1e-12)
+
+        for label, (pc, bp) in PCA_SHOCKS.items():
+            bumped = make_pca_bumped_curve(curves[d], PCA_TENORS, pca[d][0][pc], bp)
+            np.testing.assert_allclose(got[label], Bond.price_scenarios(portfolio, as_of, bumped)[0], rtol=1e-12)
+        for label, bp in shocks.items():
+            shifted = Bond.price_scenarios(portfolio, as_of, curves[d], shifts=[bp / 100])[0]
+            np.testing.assert_allclose(got[f"price_closedform_{label}bps"], shifted, rtol=1e-12)
+
+
+def test_dates_without_inputs_are_reported(inputs):
+    inv, curves, pca = inputs
+    curves = {d: c for d, c in curves.items() if d != DATES[0]}
+    pca = {d: p for d, p in pca.items() if d != DATES[1]}
+    results, errors = value_date_range(inv, curves, pca)
+    assert [d for d, _ in errors] == DATES[:2]
+    assert set(results["valuation_date"]) == {DATES[2]}
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from utils.yearfrac import year_fraction, year_fraction_act_act, year_fraction_act_act_array
+
+
+@pytest.fixture(scope="module")
+def pairs():
+    """500 (start, end) pairs over 1999-2041, many spanning several (leap) year ends."""
+    rng = np.random.default_rng(0)
+    start = np.datetime64("1999-01-01") + rng.integers(0, 365 * 30, 500)
+    return start, start + rng.integers(0, 365 * 12, 500)
+
+
+def test_array_matches_scalar_act_act(pairs):
+    start, end = pairs
+    ref = [year_fraction_act_act(s, e) for s, e in zip(start.astype(object), end.astype(object))]
+    np.testing.assert_allclose(year_fraction_act_act_array(start, end), ref, rtol=1e-13, atol=1e-15)
+    np.testing.assert_allclose(year_fraction(start, end, "ACT/ACT"), ref, rtol=1e-13, atol=1e-15)
+
+
+def test_array_act_act_is_signed(pairs):
+    start, end = pairs
+    np.testing.assert_allclose(year_fraction_act_act_array(end, start), -year_fraction_act_act_array(start, end))
+
+
+def test_actual_day_counts():
+    start, end = np.datetime64("2023-03-01"), np.datetime64("2024-03-01")
+    assert year_fraction(start, end) == 366 / 365.25
+    assert year_fraction(start, end, "ACT/365") == 366 / 365
+    with pytest.raises(ValueError):
+        year_fraction(start, end, "30/360")
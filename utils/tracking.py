@@ -0,0 +1,276 @@
+import hashlib
+import pickle
+import queue
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import mlflow
+import mlflow.sklearn
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.tracking import MlflowClient
+
+# per-request limits of MlflowClient.log_batch
+MAX_METRICS_PER_BATCH = 1000
+MAX_PARAMS_PER_BATCH = 100
+MAX_TAGS_PER_BATCH = 100
+
+
+class RunLogger:
+    """
+    Handle on one run of a DeferredTracker. Every call only enqueues work; the tracker's
+    background thread creates the run, batches its params/metrics/tags and uploads files.
+    """
+
+    def __init__(self, tracker, run_id=None):
+        self._tracker = tracker
+        self.run_id = run_id            # filled in by the worker for deferred child runs
+
+    def log_params(self, params):
+        self._tracker._put("params", self, {k: str(v) for k, v in params.items()})
+
+    def log_param(self, key, value):
+        self.log_params({key: value})
+
+    def log_metrics(self, metrics, step=0):
+        ts = int(time.time() * 1000)
+        self._tracker._put("metrics", self, [Metric(k, float(v), ts, step) for k, v in metrics.items()])
+
+    def log_metric(self, key, value, step=0):
+        self.log_metrics({key: value}, step=step)
+
+    def set_tags(self, tags):
+        self._tracker._put("tags", self, {k: str(v) for k, v in tags.items()})
+
+    def log_artifact(self, local_path, artifact_path=None):
+        self._tracker._put("artifact", self, (local_path, artifact_path))
+
+    def log_model(self, model, artifact_path="model", registered_model_name=None, input_example=None):
+        """
+        Log an sklearn model. A model whose pickled bytes were already logged under the same
+        registered name is not saved or registered again; the run gets a model_uri tag instead.
+        """
+        fingerprint = hashlib.sha256(pickle.dumps(model)).hexdigest()
+        self._tracker._put("model", self, (fingerprint, model, artifact_path, registered_model_name, input_example))
+
+    def end(self, status="FINISHED"):
+        self._tracker._put("end", self, status)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end("FINISHED" if exc_type is None else "FAILED")
+
+
+class _NullRunLogger(RunLogger):
+    """Child run in summary-only mode: everything is dropped."""
+
+    def __init__(self):
+        super().__init__(tracker=None)
+
+    def log_params(self, params): pass
+    def log_metrics(self, metrics, step=0): pass
+    def set_tags(self, tags): pass
+    def log_artifact(self, local_path, artifact_path=None): pass
+    def log_model(self, model, artifact_path="model", registered_model_name=None, input_example=None): pass
+    def end(self, status="FINISHED"): pass
+
+
+class DeferredTracker:
+    """
+    Buffered, asynchronous MLflow logging for populate jobs.
+
+      • params / metrics / tags are coalesced per run and written as log_batch calls
+        (one request per run per flush instead of one per value)
+      • run creation, artifact uploads and model logging happen on the same background thread,
+        in submission order, so callers never block on tracking I/O
+      • identical models are saved and registered once (keyed by pickled bytes + registered name)
+      • summary_only=True drops child runs entirely — no per-date runs, models or charts —
+        and keeps only the parent run's params and metrics, for large backfills
+
+    The tracker logs through MlflowClient with explicit run ids, so it is safe to use from
+    worker threads (unlike the thread-local fluent mlflow.start_run stack).
+    Failures are collected in .errors and reported on close() rather than raised into the job.
+    """
+
+    def __init__(self, run_id, experiment_id=None, summary_only=False, flush_interval=2.0, client=None):
+        self.client = client or MlflowClient()
+        self.summary_only = summary_only
+        self.flush_interval = flush_interval
+        self.experiment_id = experiment_id or self.client.get_run(run_id).info.experiment_id
+        self.parent = RunLogger(self, run_id)
+        self.errors = []
+
+        self._queue = queue.Queue()
+        self._pending = {}            # RunLogger → {"params": {}, "metrics": [], "tags": {}}
+        self._models = {}             # (fingerprint, registered name) → model URI
+        self._closed = False
+        self._lock = threading.Lock()  # makes "not closed → enqueue" atomic with close()'s stop
+        self._worker = threading.Thread(target=self._drain, name="deferred-mlflow", daemon=True)
+        self._worker.start()
+
+    # ─── parent-run shortcuts ─────────────────────────────────────────────────
+    @property
+    def run_id(self):
+        return self.parent.run_id
+
+    def log_params(self, params):
+        self.parent.log_params(params)
+
+    def log_param(self, key, value):
+        self.parent.log_param(key, value)
+
+    def log_metrics(self, metrics, step=0):
+        self.parent.log_metrics(metrics, step=step)
+
+    def log_metric(self, key, value, step=0):
+        self.parent.log_metric(key, value, step=step)
+
+    def log_artifact(self, local_path, artifact_path=None):
+        self.parent.log_artifact(local_path, artifact_path)
+
+    def log_model(self, model, artifact_path="model", registered_model_name=None, input_example=None):
+        self.parent.log_model(model, artifact_path, registered_model_name, input_example)
+
+    # ─── child runs ───────────────────────────────────────────────────────────
+    def child_run(self, run_name, params=None, tags=None):
+        """Nested run under the parent (created asynchronously); a no-op logger in summary mode."""
+        if self.summary_only:
+            return _NullRunLogger()
+        run = RunLogger(self)
+        self._put("create", run, (run_name, dict(tags or {})))
+        if params:
+            run.log_params(params)
+        return run
+
+    # ─── lifecycle ────────────────────────────────────────────────────────────
+    def flush(self, timeout=None):
+        """Block until everything queued so far has been written (a no-op once closed)."""
+        done = threading.Event()
+        with self._lock:
+            if self._closed:
+                return                  # close() already wrote everything and stopped the worker
+            self._queue.put(("flush", None, done))
+        done.wait(timeout)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(("stop", None, None))
+        self._worker.join()
+        if self.errors:
+            print(f"⚠️  {len(self.errors)} MLflow logging errors (first: {self.errors[0]})")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ─── background worker ────────────────────────────────────────────────────
+    def _put(self, kind, run, payload):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("DeferredTracker is closed")
+            self._queue.put((kind, run, payload))
+
+    def _drain(self):
+        while True:
+            try:
+                kind, run, payload = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._write_batches()
+                continue
+
+            if kind in ("params", "metrics", "tags"):
+                pending = self._pending.setdefault(run, {"params": {}, "metrics": [], "tags": {}})
+                if kind == "metrics":
+                    pending["metrics"].extend(payload)
+                else:
+                    pending[kind].update(payload)
+                continue
+
+            # anything else is ordered after the values buffered before it
+            self._write_batches()
+            if kind == "stop":
+                return
+            if kind == "flush":
+                payload.set()
+                continue
+            try:
+                self._execute(kind, run, payload)
+            except Exception as e:
+                self.errors.append(f"{kind}: {e}")
+
+    def _execute(self, kind, run, payload):
+        if kind == "create":
+            run_name, tags = payload
+            tags["mlflow.parentRunId"] = self.run_id
+            run.run_id = self.client.create_run(self.experiment_id, run_name=run_name, tags=tags).info.run_id
+        elif run.run_id is None:
+            return                      # its create failed; already reported
+        elif kind == "artifact":
+            local_path, artifact_path = payload
+            self.client.log_artifact(run.run_id, local_path, artifact_path)
+        elif kind == "model":
+            self._log_model(run, *payload)
+        elif kind == "end":
+            self.client.set_terminated(run.run_id, status=payload)
+
+    def _log_model(self, run, fingerprint, model, artifact_path, registered_model_name, input_example):
+        key = (fingerprint, registered_model_name)
+        if key in self._models:
+            self.client.set_tag(run.run_id, "model_uri", self._models[key])
+            return
+        with tempfile.TemporaryDirectory() as tmp:
+            local = f"{tmp}/{artifact_path}"
+            mlflow.sklearn.save_model(model, local, input_example=input_example)
+            self.client.log_artifacts(run.run_id, local, artifact_path)
+        uri = f"runs:/{run.run_id}/{artifact_path}"
+        if registered_model_name:
+            mlflow.register_model(uri, registered_model_name)
+        self._models[key] = uri
+
+    def _write_batches(self):
+        pending, self._pending = self._pending, {}
+        for run, values in pending.items():
+            if run.run_id is None:
+                continue
+            params = [Param(k, v) for k, v in values["params"].items()]
+            tags = [RunTag(k, v) for k, v in values["tags"].items()]
+            metrics = values["metrics"]
+            try:
+                while params or metrics or tags:
+                    self.client.log_batch(run.run_id,
+                                          metrics=metrics[:MAX_METRICS_PER_BATCH],
+                                          params=params[:MAX_PARAMS_PER_BATCH],
+                                          tags=tags[:MAX_TAGS_PER_BATCH])
+                    metrics = metrics[MAX_METRICS_PER_BATCH:]
+                    params = params[MAX_PARAMS_PER_BATCH:]
+                    tags = tags[MAX_TAGS_PER_BATCH:]
+            except Exception as e:
+                self.errors.append(f"log_batch: {e}")
+
+
+@contextmanager
+def deferred_run(run_name=None, summary_only=False, nested=False):
+    """
+    mlflow.start_run() whose logging goes through a DeferredTracker; everything queued is
+    written before the run is ended.
+
+        with deferred_run("populate", summary_only=days > 30) as tracker:
+            tracker.log_params({...})
+            with tracker.child_run(f"PCA_{d}") as run:
+                run.log_metrics({...})
+    """
+    with mlflow.start_run(run_name=run_name, nested=nested) as active:
+        tracker = DeferredTracker(active.info.run_id, experiment_id=active.info.experiment_id,
+                                  summary_only=summary_only)
+        try:
+            yield tracker
+        finally:
+            tracker.close()
@@ -1,5 +1,7 @@
 from datetime import date, datetime
 
+import numpy as np
+
 def year_fraction_act_act(start_date, end_date):
     """
     Calculate the year fraction between two dates using the ACT/ACT (ISDA) convention.
@@ -33,3 +35,53 @@ def year_fraction_act_act(start_date, end_date):
         current = segment_end
 
     return frac
+
+
+def year_fraction_act_act_array(start_dates, end_dates):
+    """
+    Vectorized ACT/ACT (ISDA) year fraction over broadcastable arrays of dates.
+
+    Accepts anything convertible to datetime64[D] (arrays, DatetimeIndex, scalars).
+    Uses year-boundary arithmetic instead of looping over calendar years:
+
+        frac = (Y_end − Y_start) + doy_end / days_in(Y_end) − doy_start / days_in(Y_start)
+
+    where doy is the 0-based day of year. Unlike year_fraction_act_act the pair is not
+    swapped: an end before the start gives a negative fraction.
+    """
+    start = np.asarray(start_dates, dtype='datetime64[D]')
+    end = np.asarray(end_dates, dtype='datetime64[D]')
+
+    def year_parts(d):
+        y = d.astype('datetime64[Y]')
+        y_start = y.astype('datetime64[D]')
+        days_in_year = ((y + 1).astype('datetime64[D]') - y_start).astype(np.int64)
+        doy = (d - y_start).astype(np.int64)
+        return y.astype(np.int64), doy, days_in_year
+
+    y_s, doy_s, len_s = year_parts(start)
+    y_e, doy_e, len_e = year_parts(end)
+    return (y_e - y_s) + doy_e / len_e - doy_s / len_s
+
+
+DAY_COUNTS = ("ACT/365.25", "ACT/365", "ACT/ACT")
+
+
+def year_fraction(start_dates, end_dates, day_count="ACT/365.25"):
+    """
+    Signed year fractions between broadcastable datetime64 arrays under the given day count:
+
+      • "ACT/365.25" : actual days / 365.25 (the pricer's historical convention)
+      • "ACT/365"    : actual days / 365
+      • "ACT/ACT"    : ACT/ACT ISDA via year_fraction_act_act_array
+    """
+    if day_count == "ACT/ACT":
+        return year_fraction_act_act_array(start_dates, end_dates)
+
+    days = (np.asarray(end_dates, dtype='datetime64[D]') - np.asarray(start_dates, dtype='datetime64[D]')) \
+           / np.timedelta64(1, 'D')
+    if day_count == "ACT/365.25":
+        return days / 365.25
+    if day_count == "ACT/365":
+        return days / 365.0
+    raise ValueError(f"Unknown day count '{day_count}' (expected one of {DAY_COUNTS})")